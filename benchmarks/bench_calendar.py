@@ -0,0 +1,42 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import warnings
+
+from figbird.transformers import calendar
+
+from . import datasets
+
+
+class Calendar:
+    params = (list(datasets.CALENDAR_AXES), [False, True])
+    param_names = ["transformer", "cyclic"]
+
+    def setup(self, transformer, cyclic):
+        warnings.simplefilter("ignore")
+        self.transformer = calendar.TRANSFORMERS[transformer]
+        self.values = datasets.CALENDAR_AXES[transformer]
+
+    def time_transform(self, transformer, cyclic):
+        self.transformer(self.values, cyclic=cyclic)
+
+
+class CalendarLarge:
+    """Calendar axes repeated over many stations or years."""
+
+    params = [10**3, 10**6]
+    param_names = ["size"]
+
+    def setup(self, size):
+        self.values = datasets.rng().integers(0, 365, size)
+
+    def time_dayofyear(self, size):
+        calendar.dayofyear(self.values)
+
+    def peakmem_dayofyear(self, size):
+        calendar.dayofyear(self.values)
@@ -0,0 +1,25 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import figbird
+
+from . import datasets
+
+
+class Envelopes:
+    params = ([1, 2, 5, 10], ["tonexty", "toself"])
+    param_names = ["n_bands", "fill"]
+
+    def setup(self, n_bands, fill):
+        self.data = datasets.quantiles(2 * n_bands, 10**4)
+
+    def time_add_envelope(self, n_bands, fill):
+        figbird.envelope(self.data, fill=fill)
+
+    def peakmem_add_envelope(self, n_bands, fill):
+        figbird.envelope(self.data, fill=fill)
@@ -0,0 +1,32 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import figbird
+
+from . import datasets
+
+
+class Export:
+    params = [10**3, 10**5, 10**6]
+    param_names = ["size"]
+    timeout = 300
+
+    def setup(self, size):
+        self.fig = figbird.line(datasets.series(size))
+
+    def time_to_json(self, size):
+        self.fig.to_json()
+
+    def peakmem_to_json(self, size):
+        self.fig.to_json()
+
+    def time_to_json_binary(self, size):
+        self.fig.to_json(binary=True)
+
+    def peakmem_to_json_binary(self, size):
+        self.fig.to_json(binary=True)
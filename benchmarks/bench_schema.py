@@ -0,0 +1,27 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+from figbird.schema import schema
+
+
+class Schema:
+    def time_getattr_format_string(self):
+        schema.line.hovertemplate
+
+    def time_getattr_magic_key(self):
+        schema.line.line_width
+
+    def time_to_dict(self):
+        schema.figures.figure.to_dict()
+
+    def time_update_kwargs(self):
+        schema.line._update_kwargs({"line": {"color": "red"}})
+
+    def time_set(self):
+        with schema.settings.set(hoverprecision=".2f"):
+            pass
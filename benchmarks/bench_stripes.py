@@ -0,0 +1,39 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import figbird
+
+from . import datasets
+
+
+class Stripes:
+    params = [100, 10**4, 10**5]
+    param_names = ["size"]
+
+    def setup(self, size):
+        self.data = datasets.series(size)
+
+    def time_add_stripes(self, size):
+        figbird.stripes(self.data)
+
+    def peakmem_add_stripes(self, size):
+        figbird.stripes(self.data)
+
+    def time_add_stripes_aggregated(self, size):
+        figbird.stripes(self.data, aggregate="auto")
+
+
+class StripesRows:
+    params = [10, 100, 500]
+    param_names = ["n_regions"]
+
+    def setup(self, n_regions):
+        self.data = datasets.stations(1, n_regions, 150).squeeze("level")
+
+    def time_add_stripes(self, n_regions):
+        figbird.stripes(self.data, dim="station")
@@ -0,0 +1,60 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import numpy as np
+
+import figbird
+
+from . import datasets
+
+SIZES = [10, 10**3, 10**5, 10**7]
+
+
+class Traces:
+    params = (["line", "scatter", "bar"], ["numpy", "xarray"], SIZES)
+    param_names = ["trace", "input", "size"]
+    timeout = 300
+
+    def setup(self, trace, input, size):
+        self.data = datasets.series(size)
+        if input == "numpy":
+            self.data = np.asarray(self.data.values)
+        self.function = getattr(figbird, trace)
+
+    def time_add(self, trace, input, size):
+        self.function(self.data, hovertemplate="%{y}")
+
+    def peakmem_add(self, trace, input, size):
+        self.function(self.data, hovertemplate="%{y}")
+
+
+class Batch:
+    params = [10, 100, 500]
+    param_names = ["n_traces"]
+
+    def setup(self, n_traces):
+        self.data = [datasets.series(100) for _ in range(n_traces)]
+
+    def time_add_line_repeated(self, n_traces):
+        fig = figbird.figures.Figure()
+        for data in self.data:
+            fig.add_line(data)
+
+    def time_add_lines(self, n_traces):
+        figbird.lines(self.data)
+
+
+class Facets:
+    params = [(1, 4), (5, 8), (10, 10)]
+    param_names = ["grid"]
+
+    def setup(self, grid):
+        self.data = datasets.stations(*grid, 240)
+
+    def time_facets(self, grid):
+        figbird.facets(self.data, row="level", col="station")
@@ -0,0 +1,61 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+"""Synthetic, reproducible inputs for the figbird benchmarks."""
+
+import numpy as np
+import xarray as xr
+
+SEED = 0
+
+
+def rng():
+    return np.random.default_rng(SEED)
+
+
+def series(size, dim="time"):
+    return xr.DataArray(
+        rng().standard_normal(size).cumsum(),
+        dims=[dim],
+        coords={dim: np.arange(size)},
+        name="t2m",
+        attrs={"units": "K", "long_name": "2 metre temperature"},
+    )
+
+
+def quantiles(n_bounds, size, dim="time"):
+    values = np.sort(rng().standard_normal((n_bounds, size)), axis=0)
+    return xr.DataArray(
+        values,
+        dims=["quantile", dim],
+        coords={dim: np.arange(size), "quantile": np.linspace(0, 1, n_bounds)},
+        name="t2m",
+        attrs={"units": "K", "long_name": "2 metre temperature"},
+    )
+
+
+def stations(n_rows, n_cols, size, dim="time"):
+    return xr.DataArray(
+        rng().standard_normal((n_rows, n_cols, size)).cumsum(axis=-1),
+        dims=["level", "station", dim],
+        coords={
+            "level": np.arange(n_rows),
+            "station": np.arange(n_cols),
+            dim: np.arange(size),
+        },
+        name="t2m",
+        attrs={"units": "K", "long_name": "2 metre temperature"},
+    )
+
+
+CALENDAR_AXES = {
+    "dayofyear": np.arange(365),
+    "weekofyear": np.arange(1, 54),
+    "month": np.arange(1, 13),
+    "season": np.array(["DJF", "MAM", "JJA", "SON"]),
+}
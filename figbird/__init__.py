@@ -6,7 +6,10 @@
 # granted to it by virtue of its status as an intergovernmental organisation
 # nor does it submit to any jurisdiction.
 
-from . import figures
+import functools
+import importlib
+
+from .profiling import profile  # noqa: F401
 from .schema import schema
 
 try:
@@ -17,27 +20,91 @@ except ImportError:  # pragma: no cover
     # Local copy or not installed with setuptools
     __version__ = "999"
 
+# Submodules which are only imported on first access, so that `import figbird`
+# does not pay for importing plotly, xarray and emohawk up front
+_LAZY_SUBMODULES = (
+    "aggregation",
+    "aio",
+    "decimation",
+    "encoding",
+    "ensembles",
+    "envelopes",
+    "export",
+    "figures",
+    "inputs",
+    "keywords",
+    "metadata",
+    "sources",
+    "subplots",
+    "text",
+    "transformers",
+)
+
+
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _new_if_none(**new_if_none_kwargs):
+    """
+    Deferred `Figure.new_if_none`, which imports `figbird.figures` (and
+    therefore plotly) on the first call instead of at import time.
+    """
+
+    def decorator(function):
+        wrapped = None
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            nonlocal wrapped
+            if wrapped is None:
+                from .figures import Figure
+
+                wrapped = Figure.new_if_none(**new_if_none_kwargs)(function)
+            return wrapped(*args, **kwargs)
+
+        return wrapper
 
-@figures.Figure.new_if_none()
+    return decorator
+
+
+@_new_if_none()
 def line(*args, fig=None, **kwargs):
     return fig.add_line(*args, **kwargs)
 
 
-@figures.Figure.new_if_none()
+@_new_if_none()
+def lines(*args, fig=None, **kwargs):
+    return fig.add_lines(*args, **kwargs)
+
+
+@_new_if_none()
 def scatter(*args, fig=None, **kwargs):
     return fig.add_scatter(*args, **kwargs)
 
 
-@figures.Figure.new_if_none()
+@_new_if_none()
 def bar(*args, fig=None, **kwargs):
     return fig.add_bar(*args, **kwargs)
 
 
-@figures.Figure.new_if_none()
+@_new_if_none()
 def envelope(*args, fig=None, **kwargs):
     return fig.add_envelope(*args, **kwargs)
 
 
-@figures.Figure.new_if_none(schema=schema.figures.stripes)
+@_new_if_none()
+def ensemble(*args, fig=None, **kwargs):
+    return fig.add_ensemble(*args, **kwargs)
+
+
+@_new_if_none()
+def facets(*args, fig=None, **kwargs):
+    return fig.add_facets(*args, **kwargs)
+
+
+@_new_if_none(schema=schema.figures.stripes)
 def stripes(*args, fig=None, **kwargs):
     return fig.add_stripes(*args, **kwargs)
@@ -0,0 +1,129 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+"""
+Module for averaging long series into coarser time bins, e.g. so that stripes
+have no more columns than can actually be resolved on screen.
+
+Each bin is labelled with a string describing the period it covers, which is
+used as the new x value so that hover labels stay meaningful.
+"""
+
+import numpy as np
+
+from .schema import schema
+
+
+def years(x):
+    """The year of each value in `x`, which may be datetimes or year numbers."""
+    x = np.asarray(x)
+    if x.dtype.kind == "M":
+        return x.astype("datetime64[Y]").astype(int) + 1970
+    if x.dtype.kind in "iu":
+        return x
+    raise TypeError(
+        f"cannot aggregate x values of type {x.dtype} by calendar period; "
+        f"x must be datetimes or integer years"
+    )
+
+
+def by_year(x):
+    keys, codes = np.unique(years(x), return_inverse=True)
+    return codes, keys.astype(str)
+
+
+def by_decade(x):
+    keys, codes = np.unique(years(x) // 10 * 10, return_inverse=True)
+    return codes, np.char.add(keys.astype(str), "s")
+
+
+def by_count(x, columns):
+    x = np.asarray(x)
+    codes = np.arange(len(x)) * columns // len(x)
+    starts = np.flatnonzero(np.diff(codes, prepend=-1))
+    ends = np.append(starts[1:], len(x)) - 1
+    labels = np.char.add(np.char.add(_format(x[starts]), " – "), _format(x[ends]))
+    return codes, labels
+
+
+FREQUENCIES = {
+    "year": by_year,
+    "decade": by_decade,
+}
+
+
+def aggregate(x, values, method="auto"):
+    """
+    Average `values` over bins of `x`.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        The x values of the series.
+    values : numpy.ndarray
+        The values to average, with `x` along the last axis. Missing values
+        are ignored.
+    method : str or int (optional)
+        How to bin `x`. Valid options are:
+        - `"year"` or `"decade"`, to average over calendar periods, in which
+          case `x` must be datetimes or integer years
+        - an integer, to average over equally-sized bins so that there are at
+          most this many bins
+        - `"auto"` (default), to use at most
+          `schema.settings.aggregation.columns` equally-sized bins
+
+    Returns
+    -------
+    tuple
+        The label of each bin, and the averaged values.
+    """
+    if method == "auto":
+        method = schema.settings.aggregation.columns
+    if isinstance(method, str):
+        if method not in FREQUENCIES:
+            raise ValueError(
+                f"invalid aggregation '{method}'; must be an integer or one of "
+                f"{['auto'] + list(FREQUENCIES)}"
+            )
+        codes, labels = FREQUENCIES[method](x)
+    elif len(x) <= method:
+        return x, values
+    else:
+        codes, labels = by_count(x, method)
+    return labels, group_mean(values, codes)
+
+
+def group_mean(values, codes):
+    """
+    Average `values` along its last axis within each group, ignoring NaNs.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        The values to average.
+    codes : numpy.ndarray of int
+        The group of each element along the last axis of `values`, numbered
+        consecutively from 0.
+    """
+    values = np.asarray(values, dtype=float)
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.diff(sorted_codes, prepend=-1))
+
+    values = values[..., order]
+    valid = ~np.isnan(values)
+    sums = np.add.reduceat(np.where(valid, values, 0), starts, axis=-1)
+    counts = np.add.reduceat(valid, starts, axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+
+def _format(x):
+    if x.dtype.kind == "M":
+        return np.datetime_as_string(x, unit="D")
+    return x.astype(str)
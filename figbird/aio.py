@@ -0,0 +1,127 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+"""
+Asynchronous counterparts of the figbird plotting functions.
+
+Each function runs its blocking counterpart, including opening and decoding
+input files, in an executor so that the event loop is never blocked.
+Independent figures can then be built concurrently:
+
+>>> import asyncio
+>>> from figbird import aio
+>>> async def build():
+...     return await asyncio.gather(aio.line([1, 2, 3]), aio.bar([3, 2, 1]))
+>>> line, bar = asyncio.run(build())
+
+By default a shared thread pool is used, in which schema overrides made with
+`schema.set` in the calling task apply. Since building traces mostly holds the
+GIL, a `concurrent.futures.ProcessPoolExecutor` set with `set_executor` (or
+passed as `executor`) can build figures in parallel instead; figures and their
+inputs are then pickled between processes, and schema overrides do not apply.
+Either way, always use the returned figure: with a process executor, a figure
+passed as `fig` is copied rather than modified in place.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import threading
+
+from . import bar, ensemble, envelope, facets, line, lines, scatter, stripes
+
+_EXECUTOR = None
+_LOCK = threading.Lock()
+
+
+def set_executor(executor):
+    """
+    Set the executor used when none is passed to a function.
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor or None
+        The executor to use; if `None`, the default thread pool is restored.
+        The previous executor is not shut down.
+    """
+    global _EXECUTOR
+    with _LOCK:
+        _EXECUTOR = executor
+
+
+def get_executor():
+    """The executor used when none is passed, creating the default if needed."""
+    global _EXECUTOR
+    with _LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+                thread_name_prefix="figbird"
+            )
+        return _EXECUTOR
+
+
+async def run(function, *args, executor=None, **kwargs):
+    """
+    Call `function(*args, **kwargs)` in `executor` and wait for the result.
+
+    If the calling task is cancelled before the call has started, the call is
+    dropped. Once started it cannot be interrupted, so cancellation waits for
+    it to finish before `asyncio.CancelledError` is raised; no figure passed
+    to the call is therefore still being modified once the cancellation has
+    been received.
+    """
+    executor = executor or get_executor()
+    call = functools.partial(function, *args, **kwargs)
+    if not isinstance(executor, concurrent.futures.ProcessPoolExecutor):
+        # Carry over context variables, such as schema overrides, to the thread
+        call = functools.partial(contextvars.copy_context().run, call)
+
+    task = executor.submit(call)
+    try:
+        return await asyncio.wrap_future(task)
+    except asyncio.CancelledError:
+        if not task.cancel():
+            await _finish(task)
+        raise
+
+
+async def _finish(task):
+    waiter = asyncio.wrap_future(task)
+    while not waiter.done():
+        try:
+            await asyncio.shield(waiter)
+        except asyncio.CancelledError:
+            continue
+        except Exception:
+            # The caller has been cancelled, so the error has nowhere to go
+            break
+    if not waiter.cancelled():
+        waiter.exception()
+
+
+def _async(function):
+    @functools.wraps(function)
+    async def wrapper(*args, executor=None, **kwargs):
+        return await run(function, *args, executor=executor, **kwargs)
+
+    wrapper.__doc__ = (
+        f"Asynchronous `figbird.{function.__name__}`, run in `executor` "
+        f"(by default that of `get_executor`)."
+    )
+    return wrapper
+
+
+line = _async(line)
+lines = _async(lines)
+scatter = _async(scatter)
+bar = _async(bar)
+envelope = _async(envelope)
+ensemble = _async(ensemble)
+facets = _async(facets)
+stripes = _async(stripes)
@@ -0,0 +1,262 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+"""
+The `figbird` command, which builds and writes the figures described in a job
+file using a pool of worker processes.
+
+A job file is a YAML or JSON mapping with a list of `jobs`, and optionally
+`defaults` merged into every job:
+
+.. code-block:: yaml
+
+    defaults:
+      schema:
+        settings:
+          hoverprecision: ".2f"
+    jobs:
+      - name: t2m
+        plot: line
+        input: data/t2m.nc
+        kwargs:
+          y: t2m
+        output: figures/t2m.html
+      - name: t2m-envelope
+        traces:
+          - {plot: envelope, input: data/t2m-ens.nc, kwargs: {dim: number}}
+          - {plot: line, input: data/t2m.nc}
+        output: figures/t2m-envelope.png
+
+Each job plots one or more traces (`plot`, `input` and `kwargs`, or a list of
+`traces` with these keys) into a single figure. `schema` overrides apply to
+that job only, and `write` holds keyword arguments for the writer, which is
+chosen from the extension of `output` (`.html`, `.json` or an image format).
+Relative paths are resolved against the directory of the job file.
+
+Each worker process imports figbird and plotly and builds a throwaway figure
+once when it starts, and keeps its cache of opened input files between jobs.
+"""
+
+import argparse
+import concurrent.futures
+import contextlib
+import json
+import os
+import time
+
+#: The plot types available to jobs.
+PLOTS = ("line", "scatter", "bar", "envelope", "stripes")
+
+#: Output extensions written with `Figure.write_image`.
+IMAGE_FORMATS = (".png", ".jpg", ".jpeg", ".webp", ".svg", ".pdf", ".eps")
+
+
+def load(path):
+    """
+    Read a job file, returning its list of jobs with defaults applied and
+    paths resolved.
+    """
+    with open(path) as f:
+        if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError(
+                    "reading YAML job files requires the pyyaml package; "
+                    "install it with 'pip install pyyaml' or use a JSON job file"
+                )
+            config = yaml.safe_load(f)
+        else:
+            config = json.load(f)
+
+    base = os.path.dirname(os.path.abspath(path))
+    defaults = config.get("defaults", dict())
+    jobs = []
+    for i, job in enumerate(config.get("jobs", [])):
+        job = _merge(defaults, job)
+        job.setdefault("name", f"job {i}")
+        if "output" not in job:
+            raise ValueError(f"{job['name']}: missing 'output'")
+        job["output"] = _resolve(base, job["output"])
+        traces = job.pop("traces", None) or [
+            {key: job.pop(key) for key in ("plot", "input", "kwargs") if key in job}
+        ]
+        for trace in traces:
+            if trace.get("plot") not in PLOTS:
+                raise ValueError(
+                    f"{job['name']}: invalid plot type '{trace.get('plot')}'; "
+                    f"must be one of {list(PLOTS)}"
+                )
+            if isinstance(trace.get("input"), str):
+                trace["input"] = _resolve(base, trace["input"])
+        job["traces"] = traces
+        jobs.append(job)
+    return jobs
+
+
+def run(jobs, workers=None):
+    """
+    Build and write `jobs` in a pool of worker processes.
+
+    Yields
+    ------
+    dict
+        The timing of each job as it completes, with the job `name` and
+        `output`, its `status` (`"ok"` or the error message), and the `build`,
+        `write` and `total` wall time in seconds.
+    """
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, initializer=_warm_up
+    ) as executor:
+        futures = {executor.submit(_run_job, job): job for job in jobs}
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                job = futures[future]
+                try:
+                    yield future.result()
+                except Exception as error:
+                    yield _timing(job, status=f"{type(error).__name__}: {error}")
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def summary(timings, wall_time=None):
+    """Format job timings as a plain text table."""
+    rows = [("job", "build", "write", "total", "status")]
+    for timing in sorted(timings, key=lambda timing: timing["name"]):
+        rows.append(
+            (timing["name"],)
+            + tuple(f"{timing[key]:.3f}s" for key in ("build", "write", "total"))
+            + (timing["status"],)
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    lines = [
+        "  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip()
+        for row in rows
+    ]
+
+    failed = sum(timing["status"] != "ok" for timing in timings)
+    footer = f"{len(timings)} jobs, {failed} failed"
+    if wall_time is not None:
+        footer += f", {wall_time:.3f}s"
+    return "\n".join(lines + [footer])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="figbird", description="Build and write the figures in a job file."
+    )
+    parser.add_argument("jobs", help="YAML or JSON job file")
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="number of worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--timings", metavar="PATH", help="also write the job timings as JSON"
+    )
+    args = parser.parse_args(argv)
+
+    jobs = load(args.jobs)
+    start = time.perf_counter()
+    timings = []
+    for timing in run(jobs, workers=args.workers):
+        timings.append(timing)
+        print(f"{timing['name']}: {timing['status']} ({timing['total']:.3f}s)")
+    wall_time = time.perf_counter() - start
+
+    print(summary(timings, wall_time))
+    if args.timings:
+        with open(args.timings, "w") as f:
+            json.dump({"jobs": timings, "wall_time": wall_time}, f, indent=2)
+    return int(any(timing["status"] != "ok" for timing in timings))
+
+
+def _warm_up():
+    import figbird
+
+    fig = figbird.line([0, 1])
+    fig.to_json()
+    figbird.schema.compile()
+
+
+def _run_job(job):
+    import figbird
+
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        _override(stack, figbird.schema, job.get("schema", dict()))
+        fig = None
+        for trace in job["traces"]:
+            plot = getattr(figbird, trace["plot"])
+            args = [trace["input"]] if "input" in trace else []
+            fig = plot(*args, fig=fig, **trace.get("kwargs", dict()))
+        built = time.perf_counter()
+        _write(fig, job["output"], **job.get("write", dict()))
+    end = time.perf_counter()
+    return _timing(job, build=built - start, write=end - built, total=end - start)
+
+
+def _write(fig, path, **kwargs):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".html":
+        fig.write_html(path, **kwargs)
+    elif extension == ".json":
+        fig.write_json(path, **kwargs)
+    elif extension in IMAGE_FORMATS:
+        fig.write_image(path, **kwargs)
+    else:
+        raise ValueError(
+            f"cannot write '{path}'; output must be .html, .json or one of "
+            f"{list(IMAGE_FORMATS)}"
+        )
+
+
+def _override(stack, node, overrides):
+    """Enter `node.set` contexts for the (nested) `overrides` mapping."""
+    from .schema import Schema
+
+    values = dict()
+    for key, value in overrides.items():
+        child = getattr(node, key, None)
+        if isinstance(value, dict) and isinstance(child, Schema):
+            _override(stack, child, value)
+        else:
+            values[key] = value
+    if values:
+        stack.enter_context(node.set(**values))
+
+
+def _timing(job, status="ok", build=0.0, write=0.0, total=0.0):
+    return {
+        "name": job["name"],
+        "output": job["output"],
+        "status": status,
+        "build": build,
+        "write": write,
+        "total": total,
+    }
+
+
+def _merge(defaults, job):
+    merged = dict(defaults)
+    for key, value in job.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            value = _merge(merged[key], value)
+        merged[key] = value
+    return merged
+
+
+def _resolve(base, path):
+    if "://" in path:
+        return path
+    return os.path.join(base, os.path.expanduser(path))
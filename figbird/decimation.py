@@ -0,0 +1,240 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+"""
+Module for reducing long series down to the number of points that can actually
+be resolved on screen.
+
+All decimation methods keep the first and last points, the overall minimum and
+maximum, and the start of every run of missing values (so that gaps in lines
+are preserved).
+"""
+
+import math
+
+import numpy as np
+
+from .schema import schema
+
+#: Array-like trace attributes which must be decimated alongside `x` and `y`.
+DECIMATED_KWARGS = ["x", "y", "customdata", "text", "hovertext"]
+
+
+def minmax(x, y, width):
+    """
+    Select the minimum and maximum point from each of `width` equally-sized
+    buckets.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        The x values of the series (unused; buckets are equally sized in
+        points, not in x).
+    y : numpy.ndarray
+        The y values of the series.
+    width : int
+        The number of buckets, typically the width of the plot in pixels.
+
+    Returns
+    -------
+    numpy.ndarray
+        The sorted indices of the points to keep.
+    """
+    n_points = len(y)
+    bucket_size = math.ceil(n_points / width)
+    n_buckets = math.ceil(n_points / bucket_size)
+
+    buckets = np.full(n_buckets * bucket_size, np.nan)
+    buckets[:n_points] = y
+    buckets = buckets.reshape(n_buckets, bucket_size)
+    finite = ~np.isnan(buckets)
+
+    offsets = np.arange(n_buckets) * bucket_size
+    has_finite = finite.any(axis=1)
+    lowest = np.where(finite, buckets, np.inf).argmin(axis=1) + offsets
+    highest = np.where(finite, buckets, -np.inf).argmax(axis=1) + offsets
+
+    return _with_endpoints(np.concatenate([lowest[has_finite], highest[has_finite]]), y)
+
+
+def lttb(x, y, width):
+    """
+    Select `width` points using the Largest-Triangle-Three-Buckets algorithm.
+
+    Each bucket keeps the point forming the largest triangle with the point
+    kept from the previous bucket and the average of the next bucket. The
+    selection within each bucket is vectorized, but buckets are processed in
+    order since each depends on the previous selection.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        The x values of the series; non-numeric (e.g. categorical) x values
+        are treated as evenly spaced.
+    y : numpy.ndarray
+        The y values of the series.
+    width : int
+        The number of points to keep, typically the width of the plot in
+        pixels.
+
+    Returns
+    -------
+    numpy.ndarray
+        The sorted indices of the points to keep.
+    """
+    n_points = len(y)
+    if width >= n_points or width < 3:
+        return np.arange(n_points)
+
+    x = _to_float(x)
+    edges = np.floor(np.linspace(1, n_points - 1, width - 1)).astype(int)
+    edges[-1] = n_points - 1
+
+    selected = np.empty(width - 2, dtype=int)
+    a = 0
+    for i in range(width - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n_points
+        next_x = x[end:next_end]
+        next_y = y[end:next_end]
+        if np.isnan(next_y).all():
+            cx, cy = x[end], y[a]
+        else:
+            cx, cy = np.nanmean(next_x), np.nanmean(next_y)
+        areas = np.abs(
+            (x[a] - cx) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (cy - y[a])
+        )
+        if np.isnan(areas).all():
+            a = start
+        else:
+            a = start + np.nanargmax(areas)
+        selected[i] = a
+
+    return _with_endpoints(selected, y)
+
+
+METHODS = {
+    "minmax": minmax,
+    "lttb": lttb,
+}
+
+
+def decimate(kwargs, method=True, width=None):
+    """
+    Decimate the array-like trace attributes in `kwargs`.
+
+    Parameters
+    ----------
+    kwargs : dict
+        Sanitised trace keyword arguments.
+    method : bool or str (optional)
+        The decimation method (one of `"minmax"` or `"lttb"`), or `True` to use
+        the default method from `schema.settings.decimation`.
+    width : int (optional)
+        The target width in pixels; defaults to the width in
+        `schema.settings.decimation`.
+
+    Returns
+    -------
+    dict
+        The decimated keyword arguments, with the original number of points
+        recorded in the trace `meta`.
+    """
+    y, indices = _select(kwargs, method, width)
+    if indices is None:
+        return kwargs
+    return _take(kwargs, indices, len(y))
+
+
+def decimate_together(traces, method=True, width=None):
+    """
+    Decimate the keyword arguments of several traces with the same points.
+
+    Traces drawn relative to each other, such as the bounds of an envelope
+    filled with `fill="tonexty"`, must keep their x values aligned, so each
+    keeps the union of the points selected for every trace.
+
+    Parameters
+    ----------
+    traces : list of dict
+        Sanitised keyword arguments of each trace.
+    method, width
+        As for `decimate`.
+
+    Returns
+    -------
+    list of dict
+        The decimated keyword arguments, unchanged if the traces do not all
+        have the same number of points or are too short to decimate.
+    """
+    selected = [_select(kwargs, method, width) for kwargs in traces]
+    lengths = {None if y is None else len(y) for y, _ in selected}
+    if len(lengths) != 1 or any(indices is None for _, indices in selected):
+        return traces
+    indices = np.unique(np.concatenate([indices for _, indices in selected]))
+    n_points = lengths.pop()
+    return [_take(kwargs, indices, n_points) for kwargs in traces]
+
+
+def _select(kwargs, method, width):
+    if method is True:
+        method = schema.settings.decimation.method
+    if method not in METHODS:
+        raise ValueError(
+            f"invalid decimation method '{method}'; must be one of {list(METHODS)}"
+        )
+    if width is None:
+        width = schema.settings.decimation.width
+
+    y = kwargs.get("y")
+    if y is None:
+        return None, None
+    y = np.asarray(y)
+    if y.dtype.kind not in "iuf" or len(y) <= width:
+        return y, None
+
+    x = kwargs.get("x")
+    x = np.arange(len(y)) if x is None else np.asarray(x)
+    return y, METHODS[method](x, y.astype(float), width)
+
+
+def _take(kwargs, indices, n_points):
+    kwargs = kwargs.copy()
+    for key in DECIMATED_KWARGS:
+        value = kwargs.get(key)
+        if value is not None and not isinstance(value, str):
+            value = np.asarray(value)
+            if value.ndim == 1 and len(value) == n_points:
+                kwargs[key] = value[indices]
+
+    meta = kwargs.get("meta")
+    if meta is None or isinstance(meta, dict):
+        kwargs["meta"] = {**(meta or {}), "original_point_count": n_points}
+
+    return kwargs
+
+
+def _to_float(x):
+    x = np.asarray(x)
+    if x.dtype.kind in "mM":
+        x = x.astype("int64")
+    elif x.dtype.kind not in "biuf":
+        # Categorical or string x values are evenly spaced along the axis
+        return np.arange(len(x), dtype=float)
+    return x.astype(float)
+
+
+def _with_endpoints(indices, y):
+    isnan = np.isnan(y)
+    gap_starts = np.flatnonzero(isnan & ~np.concatenate([[False], isnan[:-1]]))
+    extremes = []
+    if not isnan.all():
+        extremes = [np.nanargmin(y), np.nanargmax(y)]
+    return np.unique(
+        np.concatenate([[0, len(y) - 1], indices, extremes, gap_starts]).astype(int)
+    )
@@ -0,0 +1,385 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+"""
+Module for exporting figures with trace arrays as binary typed arrays.
+
+By default plotly writes every array as decimal text, which is several times
+larger and slower to produce than the raw bytes. plotly.js also understands
+arrays written as `{"dtype": ..., "bdata": ..., "shape": ...}` objects, where
+`bdata` holds the base64-encoded little-endian array data, so numeric trace
+arrays are written in that form instead. Datetime arrays are written as
+milliseconds since the epoch on axes of type `"date"`.
+
+Example
+-------
+>>> import numpy as np
+>>> import figbird
+>>> from figbird import encoding
+>>> fig = figbird.line(np.array([1.0, 2.0]))
+>>> encoding.encode(fig.to_dict())["data"][0]["y"]
+{'dtype': 'f8', 'bdata': 'AAAAAAAA8D8AAAAAAAAAQA=='}
+"""
+
+import base64
+import hashlib
+import importlib.resources
+import json
+
+import numpy as np
+
+#: Short names of the array types understood by plotly.js.
+DTYPES = {
+    "int8": "i1",
+    "uint8": "u1",
+    "int16": "i2",
+    "uint16": "u2",
+    "int32": "i4",
+    "uint32": "u4",
+    "float32": "f4",
+    "float64": "f8",
+}
+
+#: The unit of datetimes written as epoch numbers, as expected by plotly.js.
+EPOCH_UNIT = "ms"
+
+#: The JavaScript loader for deduplicated figures, relative to the package.
+LOADER = "static/figbird.js"
+
+#: Trace attributes holding values positioned along an axis.
+AXIS_ATTRIBUTES = {"x": "xaxis", "y": "yaxis"}
+
+
+def encode(figure, deduplicate=False):
+    """
+    Replace the arrays in the traces of a figure dictionary with typed arrays.
+
+    Parameters
+    ----------
+    figure : dict
+        A figure dictionary, as returned by `Figure.to_dict`. It is updated in
+        place.
+    deduplicate : bool (optional)
+        If `True`, arrays with identical contents in more than one trace are
+        written once in a top-level `"arrays"` list, and replaced in each
+        trace with a `{"ref": index}` object. Such figures must be passed
+        through the bundled JavaScript `loader` before being given to
+        plotly.js. Arrays are matched by a hash of their contents, since the
+        figure dictionary holds copies of the trace arrays, and each distinct
+        array is encoded only once.
+
+    Returns
+    -------
+    dict
+        The updated figure dictionary.
+    """
+    layout = figure.setdefault("layout", {})
+    encoded = dict() if deduplicate else None
+    for trace in figure.get("data", []):
+        for attribute, axis in AXIS_ATTRIBUTES.items():
+            values = trace.get(attribute)
+            if isinstance(values, np.ndarray) and values.dtype.kind == "M":
+                trace[attribute] = _encode_array(values, encoded, to_epoch)
+                axis = _axis_name(trace.get(axis, attribute))
+                layout.setdefault(axis, {}).setdefault("type", "date")
+        _encode_arrays(trace, encoded)
+    if deduplicate:
+        _deduplicate(figure)
+    return figure
+
+
+def decode(figure):
+    """
+    Replace the typed arrays in a figure dictionary with numpy arrays.
+
+    Epoch numbers on axes of type `"date"` are converted back to datetimes.
+
+    Parameters
+    ----------
+    figure : dict
+        A figure dictionary, as written by `encode`. It is updated in place.
+
+    Returns
+    -------
+    dict
+        The updated figure dictionary.
+    """
+    layout = figure.get("layout", {})
+    arrays = figure.pop("arrays", [])
+    decoded = dict()
+    for trace in figure.get("data", []):
+        for key, value in trace.items():
+            if _is_reference(value):
+                if value["ref"] not in decoded:
+                    decoded[value["ref"]] = from_typed_array(arrays[value["ref"]])
+                trace[key] = decoded[value["ref"]]
+        _decode_arrays(trace)
+        for attribute, axis in AXIS_ATTRIBUTES.items():
+            values = trace.get(attribute)
+            axis = layout.get(_axis_name(trace.get(axis, attribute)), {})
+            if (
+                isinstance(values, np.ndarray)
+                and values.dtype.kind in "iuf"
+                and axis.get("type") == "date"
+            ):
+                trace[attribute] = from_epoch(values)
+    return figure
+
+
+def to_typed_array(values):
+    """
+    Convert a numpy array to a plotly.js typed array specification.
+
+    64-bit integers, which plotly.js does not support, are narrowed to the
+    smallest integer type that holds their values. Arrays of any other type
+    are returned unchanged.
+    """
+    if values.size and values.dtype.kind in "iu" and values.dtype.itemsize == 8:
+        values = _narrow(values)
+    dtype = DTYPES.get(values.dtype.name)
+    if dtype is None:
+        return values
+    data = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+    spec = {"dtype": dtype, "bdata": base64.b64encode(data).decode("ascii")}
+    if values.ndim > 1:
+        spec["shape"] = ", ".join(str(size) for size in values.shape)
+    return spec
+
+
+def from_typed_array(spec):
+    """Convert a plotly.js typed array specification to a numpy array."""
+    dtype = np.dtype(spec["dtype"]).newbyteorder("<")
+    values = np.frombuffer(base64.b64decode(spec["bdata"]), dtype=dtype)
+    if "shape" in spec:
+        shape = spec["shape"]
+        if isinstance(shape, str):
+            shape = [int(size) for size in shape.split(",")]
+        values = values.reshape(shape)
+    return values
+
+
+def to_epoch(values):
+    """Convert an array of datetimes to floating point milliseconds since 1970."""
+    epoch = values.astype(f"datetime64[{EPOCH_UNIT}]")
+    result = epoch.astype("int64").astype("float64")
+    result[np.isnat(epoch)] = np.nan
+    return result
+
+
+def from_epoch(values):
+    """Convert milliseconds since 1970 to an array of datetimes."""
+    values = np.asarray(values, dtype="float64")
+    result = np.full(values.shape, np.datetime64("NaT"), f"datetime64[{EPOCH_UNIT}]")
+    valid = ~np.isnan(values)
+    result[valid] = values[valid].astype("int64")
+    return result
+
+
+def to_json(fig, pretty=False, engine=None, deduplicate=False):
+    """
+    Convert a figure to a JSON string with binary-encoded trace arrays.
+
+    Parameters
+    ----------
+    fig : plotly.graph_objects.Figure
+        The figure to convert.
+    pretty : bool (optional)
+        If `True`, produce indented output.
+    engine : str (optional)
+        The JSON encoder to use, `"orjson"` or `"json"`; by default `orjson`
+        is used if it is installed.
+    deduplicate : bool (optional)
+        If `True`, write arrays shared by several traces only once; see
+        `encode`.
+    """
+    figure = encode(fig.to_dict(), deduplicate=deduplicate)
+    return dumps(figure, pretty=pretty, engine=engine)
+
+
+def dumps(figure, pretty=False, engine=None):
+    """
+    Serialise a figure dictionary to a JSON string that is safe to embed in
+    HTML.
+
+    Unlike plotly, "/" is not escaped, since it is very common in base64 data
+    and "</" is already made safe by escaping "<".
+    """
+    import plotly.io as pio
+
+    engine = engine or pio.json.config.default_engine
+    if engine == "auto":
+        engine = "orjson" if _has_orjson() else "json"
+
+    if engine == "orjson":
+        import orjson
+
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        try:
+            string = orjson.dumps(figure, option=option).decode("utf8")
+        except TypeError:
+            # Objects that orjson cannot serialise, e.g. pandas timestamps
+            engine = "json"
+
+    if engine == "json":
+        from plotly.utils import PlotlyJSONEncoder
+
+        separators = {"indent": 2} if pretty else {"separators": (",", ":")}
+        string = json.dumps(figure, cls=PlotlyJSONEncoder, **separators)
+    elif engine != "orjson":
+        raise ValueError(f"invalid JSON engine '{engine}'; must be 'orjson' or 'json'")
+
+    for unsafe, safe in _UNSAFE_CHARACTERS:
+        if unsafe in string:
+            string = string.replace(unsafe, safe)
+    return string
+
+
+def to_html(fig, *args, **kwargs):
+    """
+    Convert a figure to an HTML string with binary-encoded trace arrays.
+
+    Accepts the same arguments as `plotly.io.to_html`.
+    """
+    import plotly.io as pio
+
+    return pio.to_html(encode(fig.to_dict()), *args, validate=False, **kwargs)
+
+
+def write_html(fig, *args, **kwargs):
+    """
+    Write a figure to an HTML file with binary-encoded trace arrays.
+
+    Accepts the same arguments as `plotly.io.write_html`.
+    """
+    import plotly.io as pio
+
+    return pio.write_html(encode(fig.to_dict()), *args, validate=False, **kwargs)
+
+
+def from_json(string):
+    """
+    Read a figure dictionary from JSON written by `to_json`, with typed arrays
+    and date axis values converted back to numpy arrays.
+    """
+    return decode(json.loads(string))
+
+
+def loader():
+    """
+    The source of the JavaScript loader for deduplicated figures.
+
+    The loader defines `figbird.resolve(figure)`, which replaces array
+    references in a figure written by `to_json(..., deduplicate=True)`, and
+    `figbird.newPlot(div, figure, config)`, which resolves a figure and plots
+    it with `Plotly.newPlot`.
+    """
+    return importlib.resources.files(__package__).joinpath(LOADER).read_text()
+
+
+_UNSAFE_CHARACTERS = (
+    ("<", "\\u003c"),
+    (">", "\\u003e"),
+    ("\u2028", "\\u2028"),
+    ("\u2029", "\\u2029"),
+)
+
+
+def _has_orjson():
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _narrow(values):
+    low, high = values.min(), values.max()
+    for dtype in ("int8", "uint8", "int16", "uint16", "int32", "uint32"):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return values.astype(dtype)
+    return values
+
+
+def _axis_name(reference):
+    # Trace axis references are of the form "x", "x2" etc.
+    return f"{reference[0]}axis{reference[1:]}"
+
+
+def _is_typed_array(value):
+    return isinstance(value, dict) and "bdata" in value and "dtype" in value
+
+
+def _is_reference(value):
+    return isinstance(value, dict) and value.keys() == {"ref"}
+
+
+def _deduplicate(figure):
+    usages = dict()
+    for trace in figure.get("data", []):
+        for key, value in trace.items():
+            if _is_typed_array(value):
+                spec = (value["dtype"], value.get("shape"), value["bdata"])
+                usages.setdefault(spec, []).append((trace, key))
+
+    arrays = []
+    for spec, usage in usages.items():
+        if len(usage) < 2:
+            continue
+        reference = {"ref": len(arrays)}
+        arrays.append(usage[0][0][usage[0][1]])
+        for trace, key in usage:
+            trace[key] = reference
+    if arrays:
+        figure["arrays"] = arrays
+
+
+def _encode_array(values, encoded=None, convert=None):
+    """
+    Encode a numpy array, reusing the result for an array with the same
+    contents if an `encoded` cache is given.
+    """
+    if encoded is not None:
+        key = (_content_key(values), convert)
+        if key in encoded:
+            return encoded[key]
+    result = to_typed_array(values if convert is None else convert(values))
+    if isinstance(result, np.ndarray) and result.dtype.kind in "US":
+        # Strings, e.g. category labels, which orjson cannot serialise
+        result = result.tolist()
+    if encoded is not None:
+        encoded[key] = result
+    return result
+
+
+def _content_key(values):
+    if values.dtype.hasobject:
+        # Object arrays have no meaningful bytes, so only match by identity
+        return id(values)
+    data = np.ascontiguousarray(values)
+    digest = hashlib.blake2b(data.view(np.uint8), digest_size=16).digest()
+    return (values.dtype.str, values.shape, digest)
+
+
+def _encode_arrays(properties, encoded=None):
+    for key, value in properties.items():
+        if isinstance(value, np.ndarray):
+            properties[key] = _encode_array(value, encoded)
+        elif isinstance(value, dict) and not _is_typed_array(value):
+            _encode_arrays(value, encoded)
+
+
+def _decode_arrays(properties):
+    for key, value in properties.items():
+        if isinstance(value, dict):
+            if _is_typed_array(value):
+                properties[key] = from_typed_array(value)
+            else:
+                _decode_arrays(value)
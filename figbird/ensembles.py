@@ -0,0 +1,178 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import numpy as np
+
+from . import inputs, metadata
+from .schema import schema
+
+COMMON_MEMBER_DIMS = [
+    "member",
+    "number",
+    "realization",
+]
+
+
+@schema.ensemble.apply()
+def add_ensemble(self, data, *args, dim=None, variable=None, **kwargs):
+    """
+    Plot every member of an ensemble as a single "spaghetti" trace.
+
+    Members are joined end-to-end into one line, separated by NaN values so
+    that each member is drawn as a separate line segment.
+
+    Parameters
+    ----------
+    data : xarray.DataArray, xarray.Dataset, str or numpy.ndarray
+        Two-dimensional data, with one dimension over ensemble members.
+        Datasets and files are opened with `figbird.inputs.open_dataarray`.
+    dim : str or int (optional)
+        The ensemble member dimension: a dimension name for xarray input
+        (guessed from common member dimension names if not given) or an axis
+        number for numpy input (default 0).
+    variable : str (optional)
+        The data variable to plot if `data` is a dataset or file; default is
+        the first data variable.
+
+    Any `sel`, `isel` or `mean_over` selection is applied to xarray input
+    before the members are flattened; see `figbird.inputs.select`.
+    """
+    if inputs.is_source(data) or metadata.is_dataarray(data):
+        data = inputs.open_dataarray(data, variable, **inputs.pop_selection(kwargs))
+        data, customdata = flatten_members(data, dim)
+    else:
+        data, x, customdata = flatten_members_numpy(
+            np.asarray(data), dim or 0, kwargs.get("x")
+        )
+        kwargs["x"] = x
+    kwargs.setdefault("customdata", customdata)
+
+    args, kwargs = self._sanitise_input(data, args, kwargs)
+    self._line(*args, **kwargs)
+    return self
+
+
+def flatten_members(dataarray, dim=None):
+    """
+    Join the members of a 2-dimensional ensemble into a single NaN-separated
+    1-dimensional `DataArray`.
+
+    Returns
+    -------
+    tuple
+        The flattened `DataArray`, and an array labelling the member of each
+        point.
+    """
+    import xarray as xr
+
+    if dim is None:
+        dim = guess_member_dim(dataarray)
+    squeeze_dims = [d for d in dataarray.dims if d != dim and dataarray.sizes[d] == 1]
+    dataarray = dataarray.squeeze(squeeze_dims, drop=True).transpose(dim, ...)
+    if dataarray.ndim != 2:
+        raise ValueError(
+            f"ensemble data must have exactly 2 dimensions (including the "
+            f"member dimension '{dim}'), but found {dataarray.ndim}"
+        )
+
+    axis_dim = dataarray.dims[1]
+    coord = dataarray[axis_dim]
+    values, coord_values = _flatten(dataarray.values, coord.values)
+
+    flat = xr.DataArray(
+        values,
+        dims=[axis_dim],
+        coords={axis_dim: (axis_dim, coord_values, coord.attrs)},
+        name=dataarray.name,
+        attrs=dataarray.attrs,
+    )
+    labels = np.array(metadata.dim_labels(dataarray, dim))
+    return flat, _member_labels(labels, coord.size)
+
+
+def flatten_members_numpy(ndarray, axis=0, x=None):
+    """
+    Join the members of a 2-dimensional ensemble array into a single
+    NaN-separated 1-dimensional array.
+
+    Returns
+    -------
+    tuple
+        The flattened array, the matching x values and an array labelling the
+        member of each point.
+    """
+    if ndarray.ndim != 2:
+        raise ValueError(
+            f"ensemble data must have exactly 2 dimensions, but found {ndarray.ndim}"
+        )
+    ndarray = np.moveaxis(ndarray, axis, 0)
+    if x is None:
+        x = np.arange(ndarray.shape[1])
+    values, x = _flatten(ndarray, np.asarray(x))
+    labels = np.array([f"member={i}" for i in range(ndarray.shape[0])])
+    return values, x, _member_labels(labels, ndarray.shape[1])
+
+
+def _flatten(values, coord):
+    n_members = values.shape[0]
+    separators = np.full((n_members, 1), np.nan)
+    values = np.concatenate([values, separators], axis=1).ravel()[:-1]
+    coord = np.tile(np.concatenate([coord, coord[-1:]]), n_members)[:-1]
+    return values, coord
+
+
+def _member_labels(labels, n_points):
+    return np.repeat(labels, n_points + 1)[:-1]
+
+
+def quantiles(data, quantiles, dim=None):
+    """
+    Reduce raw ensemble members to envelope bounds at the given quantiles.
+
+    Dask-backed xarray data is reduced chunk-by-chunk along the non-member
+    dimensions, so the full ensemble is never loaded into memory at once.
+
+    Parameters
+    ----------
+    data : xarray.DataArray or numpy.ndarray
+        Raw ensemble data, with one dimension over ensemble members.
+    quantiles : list of float
+        The quantiles to compute, between 0 and 1.
+    dim : str or int (optional)
+        The ensemble member dimension: a dimension name for xarray input
+        (guessed from common member dimension names if not given) or an axis
+        number for numpy input (default 0).
+
+    Returns
+    -------
+    xarray.DataArray or list of numpy.ndarray
+        For xarray input, the bounds along a new `quantile` dimension; for
+        numpy input, a list of bounds. Bounds are in ascending order.
+    """
+    quantiles = sorted(quantiles)
+    if not metadata.is_dataarray(data):
+        return list(np.quantile(np.asarray(data), quantiles, axis=dim or 0))
+
+    if dim is None:
+        dim = guess_member_dim(data)
+    if data.chunks is not None:
+        data = data.chunk({dim: -1})
+    return data.quantile(quantiles, dim=dim, keep_attrs=True).compute()
+
+
+def guess_member_dim(dataarray):
+    for dim in COMMON_MEMBER_DIMS:
+        if dim in dataarray.dims:
+            break
+    else:
+        raise TypeError(
+            "Could not infer the ensemble member dimension; please pass the "
+            "'dim' argument matching the name of the dimension over which "
+            "ensemble members are stored."
+        )
+    return dim
@@ -9,7 +9,9 @@
 import math
 import warnings
 
-from . import keywords, metadata
+import numpy as np
+
+from . import decimation, ensembles, inputs, keywords, metadata
 from .schema import schema
 
 COMMON_BOUNDS_DIMS = [
@@ -19,10 +21,28 @@ COMMON_BOUNDS_DIMS = [
 
 
 @schema.envelope.apply()
-def add_envelope(self, bounds, *args, dim=None, showlegend=True, **kwargs):
+def add_envelope(
+    self,
+    bounds,
+    *args,
+    dim=None,
+    showlegend=True,
+    fill="tonexty",
+    quantiles=None,
+    variable=None,
+    **kwargs,
+):
     """
     Parameters
     ----------
+    bounds : xarray.DataArray, xarray.Dataset, str or list
+        The envelope bounds, either split along the `dim` dimension or as a
+        list in ascending order; or, if `quantiles` is given, raw ensemble
+        members from which to compute the bounds. Datasets and files are
+        opened with `figbird.inputs.open_dataarray`.
+    dim : str (optional)
+        The dimension over which bounds are stored, or the ensemble member
+        dimension if `quantiles` is given.
     showlegend : bool or str (optional)
         Determines whether or not a legend is drawn. Valid options are:
         - `True`(default), in which case one legend is drawn for the entire
@@ -33,7 +53,36 @@ def add_envelope(self, bounds, *args, dim=None, showlegend=True, **kwargs):
         - `"all"`, in which case a legend is drawn for each trace in the
           envelope (not recommended, as some of the traces required for an
           envelope are invisible).
+    fill : str (optional)
+        How each band of the envelope is drawn. Valid options are:
+        - `"tonexty"` (default), in which case each band is drawn as an
+          invisible lower line and an upper line filled down to it
+        - `"toself"`, in which case each band is drawn as a single closed
+          polygon trace, halving the number of traces in the envelope
+    quantiles : list of float (optional)
+        If given, `bounds` is treated as raw ensemble data and the envelope
+        bounds are computed as these quantiles over the member dimension.
+    variable : str (optional)
+        The data variable to plot if `bounds` is a dataset or file; default is
+        the first data variable.
+
+    Any `sel`, `isel` or `mean_over` selection is applied to xarray input
+    before the envelope is built; see `figbird.inputs.select`.
     """
+    if inputs.is_source(bounds) or metadata.is_dataarray(bounds):
+        bounds = inputs.open_dataarray(bounds, variable, **inputs.pop_selection(kwargs))
+
+    if quantiles is not None:
+        bounds = ensembles.quantiles(bounds, quantiles, dim=dim)
+        dim = "quantile" if metadata.is_dataarray(bounds) else None
+
+    if fill == "toself":
+        return add_polygon_envelope(self, bounds, args, dim, showlegend, kwargs)
+    elif fill != "tonexty":
+        raise ValueError(
+            f"fill got invalid value '{fill}'; must be one of 'tonexty' or 'toself'"
+        )
+
     if not isinstance(bounds, (list, tuple)):
         if dim is None:
             dim = guess_bounds_dim(bounds)
@@ -47,29 +96,177 @@ def add_envelope(self, bounds, *args, dim=None, showlegend=True, **kwargs):
         kwargs["line_width"] = 0
         auto_line_width = True
 
-    ntraces = len(bounds)
-    for itrace, (lower, upper) in enumerate(iterate(bounds)):
+    # Decimate all bounds with the same points, so that the x values of each
+    # upper bound stay aligned with the lower bound it is filled down to
+    decimate = kwargs.pop("decimate", False)
+    sanitised = []
+    for lower, upper in iterate(bounds):
         if auto_line_width and upper is None:
             kwargs["line_width"] = schema.line.line_width
-        lower_args, lower_kwargs = self._sanitise_input(lower, args, kwargs)
-        legend_kwargs = get_legend_kwargs(
-            self, showlegend, itrace * 2, ntraces, **kwargs
+        for bound in (lower, upper):
+            if bound is not None:
+                sanitised.append(self._sanitise_input(bound, args, kwargs))
+    if decimate:
+        decimated = decimation.decimate_together(
+            [bound_kwargs for _, bound_kwargs in sanitised], method=decimate
         )
-        self._line(*lower_args, **{**lower_kwargs, **legend_kwargs})
-        if upper is not None:
-            upper_args, upper_kwargs = self._sanitise_input(upper, args, kwargs)
-            legend_kwargs = get_legend_kwargs(
-                self, showlegend, itrace * 2 + 1, ntraces, **kwargs
+        sanitised = [
+            (bound_args, bound_kwargs)
+            for (bound_args, _), bound_kwargs in zip(sanitised, decimated)
+        ]
+
+    ntraces = len(bounds)
+    for itrace, (bound_args, bound_kwargs) in enumerate(sanitised):
+        legend_kwargs = get_legend_kwargs(self, showlegend, itrace, ntraces, **kwargs)
+        if itrace % 2:
+            bound_kwargs = {"fill": "tonexty", **bound_kwargs}
+        self._line(*bound_args, **{**bound_kwargs, **legend_kwargs})
+
+    return self
+
+
+def add_polygon_envelope(self, bounds, args, dim, showlegend, kwargs):
+    if isinstance(bounds, (list, tuple)):
+        if all(metadata.is_dataarray(bound) for bound in bounds):
+            import xarray as xr
+
+            dim = "bounds"
+            bounds = xr.concat(bounds, dim=dim)
+        else:
+            bounds = np.stack([np.asarray(bound) for bound in bounds])
+
+    if keywords.get("line_color", kwargs) is None:
+        kwargs["line_color"] = self.next_color()
+
+    auto_line_width = False
+    if keywords.get("line_width", kwargs) is None:
+        kwargs["line_width"] = 0
+        auto_line_width = True
+
+    if metadata.is_dataarray(bounds):
+        import xarray as xr
+
+        if dim is None:
+            dim = guess_bounds_dim(bounds)
+        bounds = bounds.transpose(dim, ...)
+        axis_dim = bounds.dims[1]
+        name, attrs, coord_attrs = bounds.name, bounds.attrs, bounds[axis_dim].attrs
+
+        def to_input(data, index):
+            return xr.DataArray(
+                data,
+                dims=[axis_dim],
+                coords={axis_dim: (axis_dim, coord[index], coord_attrs)},
+                name=name,
+                attrs=attrs,
             )
-            self._line(*upper_args, fill="tonexty", **{**upper_kwargs, **legend_kwargs})
+
+        coord = bounds[axis_dim].values
+        bounds = bounds.values
+    else:
+        coord = kwargs.get("x")
+        if isinstance(coord, str):
+            # Transform the whole axis (e.g. "calendar.month") once, before it
+            # is folded into polygons
+            kwargs = self.transform(coord, "x", kwargs)
+            coord = kwargs["x"]
+        if coord is None:
+            coord = np.arange(bounds.shape[1])
+        coord = np.asarray(coord)
+        customdata = kwargs.get("customdata")
+        if customdata is not None and len(customdata) != len(coord):
+            customdata = None
+
+        def to_input(data, index):
+            kwargs["x"] = coord[index]
+            if customdata is not None:
+                kwargs["customdata"] = np.asarray(customdata)[index]
+            return data
+
+    values, middle = polygons(bounds)
+    forwards = np.arange(len(coord))
+    polygon_index = np.concatenate([forwards, forwards[::-1]])
+
+    ntraces = len(values) + (middle is not None)
+    for itrace, polygon in enumerate(values):
+        polygon_args, polygon_kwargs = self._sanitise_input(
+            to_input(polygon, polygon_index), args, kwargs
+        )
+        legend_kwargs = get_polygon_legend_kwargs(
+            self, showlegend, itrace, ntraces, **kwargs
+        )
+        self._line(
+            *polygon_args,
+            fill="toself",
+            hoveron="points",
+            **{**polygon_kwargs, **legend_kwargs},
+        )
+
+    if middle is not None:
+        if auto_line_width:
+            kwargs["line_width"] = schema.line.line_width
+        middle_args, middle_kwargs = self._sanitise_input(
+            to_input(middle, forwards), args, kwargs
+        )
+        legend_kwargs = get_polygon_legend_kwargs(
+            self, showlegend, ntraces - 1, ntraces, **kwargs
+        )
+        self._line(*middle_args, **{**middle_kwargs, **legend_kwargs})
 
     return self
 
 
+def polygons(bounds):
+    """
+    Build closed polygons from pairs of envelope bounds in a single pass.
+
+    Parameters
+    ----------
+    bounds : numpy.ndarray
+        A 2-dimensional array of bounds in ascending order along the first
+        axis (i.e. lowest to highest).
+
+    Returns
+    -------
+    tuple
+        An array with one closed polygon (lower bound forwards, upper bound
+        reversed) per row, ordered from the outermost band inwards, and the
+        middle bound if there is an odd number of bounds (otherwise `None`).
+    """
+    n_bands = len(bounds) // 2
+    lower = bounds[:n_bands]
+    upper = bounds[::-1][:n_bands, ::-1]
+    values = np.concatenate([lower, upper], axis=1)
+    middle = bounds[n_bands] if len(bounds) % 2 else None
+    return values, middle
+
+
+def get_polygon_legend_kwargs(figure, showlegend, itrace, ntraces, **kwargs):
+    legend_kwargs = dict()
+    if showlegend is True:
+        legendgroup = kwargs.get("name", f"trace {figure._data_count()-itrace}")
+        legend_kwargs["legendgroup"] = kwargs.get("legendgroup", legendgroup)
+        legend_kwargs["showlegend"] = itrace == 0
+    elif showlegend is False:
+        legend_kwargs["showlegend"] = False
+    elif showlegend == "all":
+        legend_kwargs["showlegend"] = True
+    elif showlegend == "bounds":
+        legendgroup = kwargs.get("name", f"trace {figure._data_count()}")
+        legend_kwargs["legendgroup"] = kwargs.get("legendgroup", legendgroup)
+        legend_kwargs["showlegend"] = True
+    else:
+        raise ValueError(
+            f"showlegend got invalid value '{showlegend}'; must be one of "
+            f"True, False, 'bounds' or 'all'"
+        )
+    return legend_kwargs
+
+
 def get_legend_kwargs(figure, showlegend, itrace, ntraces, **kwargs):
     legend_kwargs = dict()
     if showlegend is True:
-        legendgroup = kwargs.get("name", f"trace {len(figure.data)-itrace}")
+        legendgroup = kwargs.get("name", f"trace {figure._data_count()-itrace}")
         legend_kwargs["legendgroup"] = kwargs.get("legendgroup", legendgroup)
         legend_kwargs["showlegend"] = itrace == 1
     elif showlegend is False:
@@ -81,7 +278,7 @@ def get_legend_kwargs(figure, showlegend, itrace, ntraces, **kwargs):
         )
         legend_kwargs["showlegend"] = True
     elif showlegend == "bounds":
-        group_trace = len(figure.data) - math.ceil((itrace) / 2)
+        group_trace = figure._data_count() - math.ceil((itrace) / 2)
         legendgroup = kwargs.get("name", f"trace {group_trace}")
         legend_kwargs["showlegend"] = bool(itrace % 2) or itrace + 1 == ntraces
         legend_kwargs["legendgroup"] = kwargs.get("legendgroup", legendgroup)
@@ -120,7 +317,7 @@ def legend_kwargs(figure, showlegend, kwargs):
     elif showlegend is False:
         kwargs["showlegend"] = False
     elif showlegend == "once":
-        legendgroup = kwargs.get("name", f"trace {len(figure.data)}")
+        legendgroup = kwargs.get("name", f"trace {figure._data_count()}")
         kwargs["legendgroup"] = kwargs.get("legendgroup", legendgroup)
     elif showlegend == "all":
         kwargs["showlegend"] = True
@@ -0,0 +1,238 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+"""
+Module for exporting many figures to static images.
+
+`fig.write_image` starts kaleido, and with it a headless browser, in the
+calling process, which dominates the cost of writing a single image. An
+`ImagePool` instead keeps a number of worker processes alive, each with a
+running kaleido renderer, and spreads images across them.
+
+Example
+-------
+>>> import figbird
+>>> from figbird.export import ImagePool
+>>> with ImagePool(workers=4, format="png") as pool:  # doctest: +SKIP
+...     for i, data in enumerate(datasets):
+...         pool.submit(figbird.line(data), f"line-{i}.png")
+>>> print(pool.summary())  # doctest: +SKIP
+"""
+
+import collections
+import concurrent.futures
+import importlib.util
+import multiprocessing
+import multiprocessing.util
+import os
+import threading
+import time
+
+#: The result of writing one image.
+#: `latency` is the wall time in seconds from submission to completion,
+#: including time spent waiting for a worker, and `render` is the time spent
+#: rendering and writing the image in the worker.
+ImageResult = collections.namedtuple("ImageResult", ["path", "latency", "render"])
+
+
+class ImagePool:
+    """
+    Pool of long-lived processes writing figures to static images.
+
+    Parameters
+    ----------
+    workers : int (optional)
+        The number of worker processes; defaults to the number of CPUs.
+    max_pending : int (optional)
+        The maximum number of images submitted but not yet written. Once
+        reached, `submit` blocks until an image is done, so that producers
+        cannot run arbitrarily far ahead of the renderers. Defaults to twice
+        the number of workers.
+    render : callable (optional)
+        The function called in the workers as `render(figure, path,
+        **options)` with the figure dictionary; must be picklable. Defaults to
+        `write_image`, which uses kaleido.
+    **options
+        Default options passed to `render` for every image, e.g. `format`,
+        `width`, `height` and `scale`.
+    """
+
+    def __init__(self, workers=None, max_pending=None, render=None, **options):
+        if render is None:
+            if importlib.util.find_spec("kaleido") is None:
+                raise ImportError(
+                    "exporting static images requires the kaleido package; "
+                    "install it with 'pip install kaleido'"
+                )
+            render = write_image
+        workers = workers or os.cpu_count() or 1
+        self.workers = workers
+        self.max_pending = max_pending or 2 * workers
+        self.results = []
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_start_worker,
+            initargs=(render, options),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(cancel=exc_type is not None)
+
+    def submit(self, fig, path, **options):
+        """
+        Queue `fig` to be written to `path`, blocking while `max_pending`
+        images are already queued.
+
+        Parameters
+        ----------
+        fig : plotly.graph_objects.Figure or dict
+            The figure to write.
+        path : str or os.PathLike
+            The output path; the image format is taken from its extension
+            unless a `format` option is given.
+        **options
+            Options passed to `render` for this image only.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            A future resolving to an `ImageResult`.
+        """
+        if self._closed:
+            raise RuntimeError("cannot submit images to a closed pool")
+        figure = fig if isinstance(fig, dict) else fig.to_dict()
+        path = os.fspath(path)
+
+        self._slots.acquire()
+        start = time.perf_counter()
+        try:
+            task = self._executor.submit(_render_image, figure, path, options)
+        except BaseException:
+            self._slots.release()
+            raise
+        future = concurrent.futures.Future()
+        task.add_done_callback(lambda task: self._done(task, future, start))
+        return future
+
+    def map(self, jobs, **options):
+        """
+        Write each `(fig, path)` pair of `jobs`, yielding an `ImageResult` for
+        each image as it is written.
+
+        Jobs are consumed lazily, so `jobs` may be a generator producing
+        figures on the fly; at most `max_pending` figures are held at once.
+        Errors raised while writing an image are re-raised here.
+        """
+        pending = set()
+        for fig, path in jobs:
+            pending.add(self.submit(fig, path, **options))
+            done = {future for future in pending if future.done()}
+            pending -= done
+            for future in done:
+                yield future.result()
+        for future in concurrent.futures.as_completed(pending):
+            yield future.result()
+
+    def close(self, wait=True, cancel=False):
+        """
+        Shut the pool down, stopping the renderers and their worker processes.
+
+        Parameters
+        ----------
+        wait : bool (optional)
+            If `True` (default), wait for the workers to exit.
+        cancel : bool (optional)
+            If `True`, drop queued images that have not started rendering.
+            Otherwise (default), all submitted images are written first.
+        """
+        self._closed = True
+        self._executor.shutdown(wait=wait, cancel_futures=cancel)
+
+    def summary(self):
+        """
+        Latency statistics of the images written so far.
+
+        Returns
+        -------
+        dict
+            The `count` of images written, and the `mean`, `median`, `p95`
+            and `max` latency and mean `render` time in seconds.
+        """
+        with self._lock:
+            latencies = sorted(result.latency for result in self.results)
+            renders = [result.render for result in self.results]
+        if not latencies:
+            return {"count": 0}
+        return {
+            "count": len(latencies),
+            "mean": sum(latencies) / len(latencies),
+            "median": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "max": latencies[-1],
+            "render": sum(renders) / len(renders),
+        }
+
+    def _done(self, task, future, start):
+        self._slots.release()
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            path, render = task.result()
+            result = ImageResult(path, time.perf_counter() - start, render)
+            with self._lock:
+                self.results.append(result)
+            future.set_result(result)
+
+
+def write_image(figure, path, **options):
+    """Write a figure dictionary to `path` with kaleido."""
+    import plotly.io as pio
+
+    pio.write_image(figure, path, validate=False, engine="kaleido", **options)
+
+
+def _percentile(values, percent):
+    index = min(len(values) - 1, round(percent / 100 * (len(values) - 1)))
+    return values[index]
+
+
+_WORKER = dict()
+
+
+def _start_worker(render, options):
+    _WORKER.update(render=render, options=options)
+    if render is write_image:
+        # Start kaleido (and its browser) now, rather than on the first image
+        import plotly.io as pio
+
+        pio.to_image({"data": [], "layout": {}}, validate=False, engine="kaleido")
+        multiprocessing.util.Finalize(None, _stop_kaleido, exitpriority=10)
+
+
+def _stop_kaleido():
+    import plotly.io as pio
+
+    scope = getattr(pio.kaleido, "scope", None)
+    shutdown = getattr(scope, "_shutdown_kaleido", None)
+    if shutdown is not None:
+        shutdown()
+
+
+def _render_image(figure, path, options):
+    start = time.perf_counter()
+    _WORKER["render"](figure, path, **dict(_WORKER["options"], **options))
+    return path, time.perf_counter() - start
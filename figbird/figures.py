@@ -6,9 +6,20 @@
 # granted to it by virtue of its status as an intergovernmental organisation
 # nor does it submit to any jurisdiction.
 
+import contextlib
+
+import numpy as np
 import plotly.graph_objects as go
 
-from . import inputs, transformers
+from . import (
+    aggregation,
+    decimation,
+    encoding,
+    inputs,
+    metadata,
+    profiling,
+    transformers,
+)
 from .schema import schema
 
 
@@ -18,12 +29,33 @@ class Figure(go.Figure):
     _SANITISERS = (inputs.xarray, inputs.numpy, inputs.plotly)
     _TRANSFORMERS = (transformers.calendar.calendar,)
 
-    from .envelopes import add_envelope
+    #: Scatter attributes with no WebGL equivalent, dropped from Scattergl traces
+    _SVG_ONLY_KWARGS = ("hoveron", "cliponaxis")
 
-    def __init__(self, *args, schema=schema.figures.figure, **kwargs):
+    from .ensembles import add_ensemble
+    from .envelopes import add_envelope
+    from .subplots import add_facets
+
+    def __init__(self, *args, schema=schema.figures.figure, validate=True, **kwargs):
+        """
+        Parameters
+        ----------
+        schema : figbird.schema.Schema (optional)
+            The schema used to style the figure.
+        validate : bool (optional)
+            If `False`, traces are built without plotly's validation, so that
+            they are validated only once, when plotly adds them to the figure,
+            rather than also when they are created. Invalid trace properties
+            are then reported as each trace is added. The figure holds the
+            same values either way, although nested properties may be
+            serialised in a different order. Defaults to `True`.
+        """
         super().__init__(*args, **schema._update_kwargs(kwargs))
         self._schema = schema
+        self._validate_traces = validate
         self._trace_count = len(self.data)
+        self._pending_traces = None
+        self._point_count = sum(count_points(trace) for trace in self.data)
 
     @classmethod
     def new_if_none(cls, schema=schema.figures.figure):
@@ -46,20 +78,36 @@ class Figure(go.Figure):
 
         return wrapper
 
+    @profiling.timed("sanitise", method=True)
     def _sanitise_input(self, data, args, kwargs):
         kwargs = kwargs.copy()
-        for sanitiser in self._SANITISERS:
+        decimate = kwargs.pop("decimate", False)
+        sanitised_input = None
+        registered = inputs.get_sanitiser(type(data))
+        if registered is not None:
             try:
-                sanitised_input = sanitiser(self, data, args, kwargs)
+                sanitised_input = registered(self, data, args, kwargs)
             except NotImplementedError:  # from emohawk
-                continue
+                pass
+
+        if sanitised_input is None:
+            for sanitiser in self._SANITISERS:
+                if sanitiser is registered:
+                    # Already tried above, so don't open the input again
+                    continue
+                try:
+                    sanitised_input = sanitiser(self, data, args, kwargs)
+                except NotImplementedError:  # from emohawk
+                    continue
+                else:
+                    if sanitised_input is not None:
+                        break
             else:
-                if sanitised_input is not None:
-                    break
-        else:
-            raise TypeError(f"unable to handle input of type {type(data)}")
+                raise TypeError(f"unable to handle input of type {type(data)}")
 
         args, kwargs = sanitised_input
+        if decimate:
+            kwargs = decimation.decimate(kwargs, method=decimate)
         if "name" not in kwargs:
             kwargs["name"] = f"trace {self._trace_count}"
 
@@ -76,6 +124,133 @@ class Figure(go.Figure):
 
         return decorator
 
+    @contextlib.contextmanager
+    def batch_traces(self):
+        """
+        Collect all traces added within this context and add them to the figure
+        in a single `add_traces` call on exit.
+
+        Only the final `add_traces` call is batched: each input is still
+        sanitised by its own `add_*` call. Nested contexts are merged into the
+        outermost context.
+        """
+        if self._pending_traces is not None:
+            yield self
+            return
+        self._pending_traces = []
+        try:
+            yield self
+        finally:
+            traces, self._pending_traces = self._pending_traces, None
+            if traces:
+                self._add_traces(traces)
+
+    def _add_trace(self, trace):
+        if self._pending_traces is None:
+            self._add_traces([trace])
+        else:
+            self._pending_traces.append(trace)
+
+    def _add_traces(self, traces):
+        with profiling.stage("add_trace", self):
+            if self._use_webgl():
+                traces = self._to_webgl(traces)
+            self.add_traces(traces)
+
+    def _use_webgl(self):
+        threshold = schema.settings.webgl.threshold
+        return threshold is not None and self._point_count > threshold
+
+    def _to_webgl(self, traces):
+        """
+        Convert the `Scatter` traces of the figure and of `traces` to WebGL
+        `Scattergl` traces, returning all traces to add to the figure.
+
+        The renderer is chosen for the figure as a whole, so once its points
+        pass the threshold, traces already in the figure are converted too.
+        Non-scatter traces are re-added unchanged, keeping the trace order.
+        """
+        if any(isinstance(trace, go.Scatter) for trace in self.data):
+            traces = list(self.data) + list(traces)
+            self.data = ()
+        return [
+            self._webgl_trace(trace) if isinstance(trace, go.Scatter) else trace
+            for trace in traces
+        ]
+
+    def _webgl_trace(self, trace):
+        properties = trace.to_plotly_json()
+        properties.pop("type", None)
+        for key in self._SVG_ONLY_KWARGS:
+            properties.pop(key, None)
+        return self._trace(go.Scattergl, **properties)
+
+    def _trace(self, trace_class, *args, **kwargs):
+        return trace_class(*args, _validate=self._validate_traces, **kwargs)
+
+    def _data_count(self):
+        return len(self.data) + len(self._pending_traces or ())
+
+    def add_traces_from(
+        self, data, *args, trace_type="line", dim=None, variables=None, **kwargs
+    ):
+        """
+        Add one trace per input, sending all traces to plotly in a single
+        `add_traces` call (see `batch_traces`).
+
+        Each input is sanitised separately, as by repeated `add_*` calls; only
+        a single xarray object split along `dim` or into `variables` is opened
+        and reduced once for all of its traces.
+
+        Parameters
+        ----------
+        data : list or xarray.DataArray or xarray.Dataset
+            A sequence of inputs, each accepted by the matching `add_*` method,
+            or a single xarray object (or file) to be split along `dim` or into
+            `variables`.
+        trace_type : str (optional)
+            The type of trace to add, i.e. the suffix of an `add_*` method;
+            default is `"line"`.
+        dim : str (optional)
+            The dimension over which to split `data` into separate traces.
+        variables : str or list of str (optional)
+            The data variables to plot as separate traces, or `"all"` to plot
+            every data variable. The dataset is opened and reduced (see
+            `figbird.inputs.select`) only once, and each trace is named after
+            its variable.
+        """
+        add_trace = getattr(self, f"add_{trace_type}")
+        if variables is not None:
+            if dim is not None:
+                raise ValueError("only one of 'dim' or 'variables' may be given")
+            dataset = inputs.open_dataset(data, **inputs.pop_selection(kwargs))
+            data = metadata.split_variables(dataset, variables)
+            # Pass each variable on as an open dataset, so that it is not
+            # opened or reduced again
+            items = [
+                (item.to_dataset(), {"name": metadata.get_axis_title(item), **kwargs})
+                for item in data
+            ]
+            if len(data) > 1 and self.layout.yaxis.title.text is None:
+                units = {metadata.get_units(item) for item in data}
+                title = units.pop() if len(units) == 1 else ""
+                self.update_layout(yaxis={"title": title})
+        else:
+            if dim is not None:
+                data = metadata.split_dim(data, dim)
+            items = [(item, kwargs) for item in data]
+
+        with self.batch_traces():
+            for item, item_kwargs in items:
+                add_trace(item, *args, **item_kwargs)
+        return self
+
+    def add_lines(self, data, *args, dim=None, variables=None, **kwargs):
+        return self.add_traces_from(
+            data, *args, trace_type="line", dim=dim, variables=variables, **kwargs
+        )
+
+    @profiling.timed("transform", method=True)
     def transform(self, name, axis, kwargs):
         module, name = name.split(".")
         transformer = [t for t in self._TRANSFORMERS if module == t.__name__]
@@ -92,11 +267,15 @@ class Figure(go.Figure):
     @schema.line.apply()
     @sanitise
     def add_line(self, *args, **kwargs):
+        if kwargs.get("mode") is None:
+            threshold = schema.settings.line.marker_threshold
+            short = threshold is not None and count_points(kwargs) <= threshold
+            kwargs["mode"] = "lines+markers" if short else "lines"
         self._line(*args, **kwargs)
         return self
 
     def _line(self, *args, **kwargs):
-        self.add_trace(go.Scatter(*args, **kwargs))
+        self._add_trace(self._scatter_trace(*args, **kwargs))
 
     @schema.scatter.apply()
     @sanitise
@@ -106,7 +285,23 @@ class Figure(go.Figure):
         return self
 
     def _scatter(self, *args, **kwargs):
-        self.add_trace(go.Scatter(*args, **kwargs))
+        self._add_trace(self._scatter_trace(*args, **kwargs))
+
+    @profiling.timed("build_trace", method=True)
+    def _scatter_trace(self, *args, **kwargs):
+        """
+        Create a `Scatter` trace, or a WebGL `Scattergl` trace once the total
+        number of points in the figure passes `schema.settings.webgl.threshold`.
+
+        The `Scatter` traces already in the figure are converted when the
+        trace is added, so that a figure never mixes the two renderers.
+        """
+        self._point_count += count_points(kwargs)
+        if self._use_webgl():
+            for key in self._SVG_ONLY_KWARGS:
+                kwargs.pop(key, None)
+            return self._trace(go.Scattergl, *args, **kwargs)
+        return self._trace(go.Scatter, *args, **kwargs)
 
     @schema.bar.apply()
     @sanitise
@@ -116,10 +311,37 @@ class Figure(go.Figure):
         return self
 
     def _bar(self, *args, **kwargs):
-        self.add_trace(go.Bar(*args, **kwargs))
+        with profiling.stage("build_trace", self):
+            trace = self._trace(go.Bar, *args, **kwargs)
+        self._add_trace(trace)
 
     @count_traces(n_traces=1)
     def add_stripes(self, *args, diverging=True, divergence_point=0, **kwargs):
+        """
+        Plot data as colour "stripes" in a single heatmap trace.
+
+        Parameters
+        ----------
+        data : xarray.DataArray or numpy.ndarray
+            One-dimensional data, drawn as a single row of stripes, or
+            two-dimensional data, drawn with one row of stripes per element of
+            `dim` (e.g. one row per region).
+        diverging : bool (optional)
+            If `True` (default), the colour scale is centred on
+            `divergence_point`, with the same range across all rows.
+        divergence_point : float (optional)
+            The value at the centre of a diverging colour scale; default is 0.
+        dim : str or int (optional)
+            The dimension (or axis, for numpy input) holding the rows of
+            two-dimensional data; required if the data has two dimensions
+            longer than one. Other singleton dimensions are squeezed out.
+        aggregate : str or int (optional)
+            If given, average the data over bins of the x axis so that there
+            are fewer, wider stripes: `"year"` or `"decade"` for calendar
+            periods, an integer for at most that many equally-sized bins, or
+            `"auto"` for at most `schema.settings.aggregation.columns` bins.
+            See `figbird.aggregation.aggregate`.
+        """
         hoverprecision = schema.settings.hoverprecision
         if diverging:
             hoverprecision = f"+{hoverprecision}"
@@ -133,13 +355,40 @@ class Figure(go.Figure):
         return result
 
     @schema.stripes.apply()
-    @sanitise
-    def _add_stripes(self, *args, diverging, divergence_point, **kwargs):
+    def _add_stripes(
+        self,
+        data=None,
+        *args,
+        diverging,
+        divergence_point,
+        dim=None,
+        aggregate=None,
+        **kwargs,
+    ):
+        data, dim = self._squeeze_stripes(data, dim, kwargs)
+        if np.ndim(data) == 2:
+            if dim is None:
+                raise ValueError(
+                    "two-dimensional stripes data needs a 'dim' argument naming "
+                    "the dimension (or axis) that holds the rows of stripes"
+                )
+            y, z, first_row = self._stripes_rows(data, dim)
+            args, kwargs = self._sanitise_input(first_row, args, kwargs)
+            kwargs.pop("y", None)
+            if "%{y}" not in kwargs.get("hovertemplate", "%{y}"):
+                kwargs["hovertemplate"] = f"%{{y}}<br>{kwargs['hovertemplate']}"
+        else:
+            args, kwargs = self._sanitise_input(data, args, kwargs)
+            z = np.asarray(kwargs.pop("y", kwargs.pop("z", None)))
+            y = np.ones(len(z), dtype=int)
 
-        z = kwargs.pop("y", kwargs.pop("z", None))
+        if aggregate:
+            kwargs["x"], z = aggregation.aggregate(kwargs["x"], z, aggregate)
+            if z.ndim == 1:
+                y = np.ones(len(z), dtype=int)
 
-        zmin = min(z)
-        zmax = max(z)
+        zmin = np.nanmin(z)
+        zmax = np.nanmax(z)
 
         if diverging:
             abs_zmax = max(zmax - divergence_point, divergence_point - zmin)
@@ -147,16 +396,98 @@ class Figure(go.Figure):
             zmin = divergence_point - abs_zmax
             kwargs["colorscale"] = kwargs.pop("colorscale", "RdBu_r")
 
-        self._heatmap(*args, y=[1] * len(z), z=z, zmin=zmin, zmax=zmax, **kwargs)
+        self._heatmap(*args, y=y, z=z, zmin=zmin, zmax=zmax, **kwargs)
         return self
 
+    def _squeeze_stripes(self, data, dim, kwargs):
+        """
+        Apply any selection to stripes data and squeeze out its singleton
+        dimensions, except the row dimension `dim` if given.
+        """
+        if metadata.is_dataarray(data):
+            data = inputs.select(data, **inputs.pop_selection(kwargs))
+            return (
+                data.squeeze([d for d in data.dims if d != dim and data.sizes[d] == 1]),
+                dim,
+            )
+        if not isinstance(data, (list, tuple, np.ndarray)):
+            return data, dim
+        data = np.asarray(data)
+        if dim is not None:
+            dim %= data.ndim
+        axes = [
+            axis for axis, size in enumerate(data.shape) if axis != dim and size == 1
+        ]
+        if dim is not None:
+            dim -= sum(axis < dim for axis in axes)
+        return data.squeeze(tuple(axes)), dim
+
+    def _stripes_rows(self, data, dim):
+        """
+        Split two-dimensional stripes data into its row labels, its values
+        with one row per stripe and a single row used to sanitise the x axis.
+        """
+        if metadata.is_dataarray(data):
+            data = data.transpose(dim, ...)
+            return data[dim].values, data.values, data.isel({dim: 0})
+        values = np.moveaxis(data, dim, 0)
+        return np.arange(len(values)), values, values[0]
+
     def _heatmap(self, *args, **kwargs):
-        self.add_trace(go.Heatmap(*args, **kwargs))
+        with profiling.stage("build_trace", self):
+            trace = self._trace(go.Heatmap, *args, **kwargs)
+        self._add_trace(trace)
 
     add_envelope = count_traces(n_traces=1)(add_envelope)
 
+    add_ensemble = count_traces(n_traces=1)(add_ensemble)
+
+    @profiling.timed("serialise", method=True)
+    def to_json(self, *args, binary=False, deduplicate=False, **kwargs):
+        """
+        Convert the figure to a JSON string.
+
+        If `binary` is `True`, trace arrays are written as base64-encoded typed
+        arrays, and if `deduplicate` is also `True` arrays with identical
+        contents in several traces are written only once; see
+        `figbird.encoding`.
+        """
+        if binary:
+            return encoding.to_json(self, *args, deduplicate=deduplicate, **kwargs)
+        if deduplicate:
+            raise ValueError("deduplicate=True requires binary=True")
+        return super().to_json(*args, **kwargs)
+
+    @profiling.timed("serialise", method=True)
+    def to_html(self, *args, binary=False, **kwargs):
+        if binary:
+            return encoding.to_html(self, *args, **kwargs)
+        return super().to_html(*args, **kwargs)
+
+    @profiling.timed("serialise", method=True)
+    def write_html(self, *args, binary=False, **kwargs):
+        if binary:
+            return encoding.write_html(self, *args, **kwargs)
+        return super().write_html(*args, **kwargs)
+
+    @profiling.timed("serialise", method=True)
+    def write_json(self, *args, **kwargs):
+        return super().write_json(*args, **kwargs)
+
     def format_hovertemplate(self, hovertemplate):
         return hovertemplate
 
     def next_color(self):
-        return self._schema.layout.colorway[len(self.data)]
+        return self._schema.layout.colorway[self._data_count()]
+
+
+def count_points(trace):
+    """Count the number of points in a trace or a dict of trace kwargs."""
+    for axis in ("y", "x", "z"):
+        try:
+            values = trace[axis]
+        except (KeyError, ValueError):
+            continue
+        if values is not None and not isinstance(values, str):
+            return len(values)
+    return 0
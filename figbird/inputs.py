@@ -6,14 +6,183 @@
 # granted to it by virtue of its status as an intergovernmental organisation
 # nor does it submit to any jurisdiction.
 
+import os
+import sys
 import warnings
 
-import emohawk
-import xarray as xr
+import numpy as np
 
-from . import metadata, transformers
+from . import metadata, profiling, sources, transformers
 
-INPUT_ONLY_KWARGS = ["cyclic"]
+SELECTION_KWARGS = ["sel", "isel", "mean_over", "nearest"]
+
+INPUT_ONLY_KWARGS = ["cyclic"] + SELECTION_KWARGS
+
+_REGISTRY = dict()
+_RESOLVED = dict()
+
+
+def register(*types):
+    """
+    Register a sanitiser for one or more input types.
+
+    Sanitisers are looked up by the type of the input data (including its base
+    classes), so that each input is handled by a single sanitiser instead of
+    trying each sanitiser in turn.
+
+    Parameters
+    ----------
+    *types : type or str
+        The input types handled by the sanitiser, either as types or as fully
+        qualified type names (e.g. `"pandas.core.series.Series"`), which
+        avoids importing the module defining the type.
+
+    Example
+    -------
+    >>> @register("pandas.core.series.Series")
+    ... def series(self, data, args, kwargs):
+    ...     return args, {**kwargs, "x": data.index, "y": data.values}
+    """
+
+    def decorator(sanitiser):
+        for data_type in types:
+            _REGISTRY[data_type] = sanitiser
+        _RESOLVED.clear()
+        return sanitiser
+
+    return decorator
+
+
+def unregister(*types):
+    """
+    Remove the sanitisers registered for one or more input types.
+
+    Parameters
+    ----------
+    *types : type or str
+        The input types, exactly as they were passed to `register`. Types with
+        no registered sanitiser are ignored.
+    """
+    for data_type in types:
+        _REGISTRY.pop(data_type, None)
+    _RESOLVED.clear()
+
+
+def get_sanitiser(data_type):
+    """
+    Get the registered sanitiser for an input type, or `None` if there is no
+    sanitiser registered for the type or any of its base classes.
+    """
+    try:
+        return _RESOLVED[data_type]
+    except KeyError:
+        pass
+
+    sanitiser = None
+    for base in data_type.__mro__:
+        for key in (base, f"{base.__module__}.{base.__qualname__}"):
+            if key in _REGISTRY:
+                sanitiser = _REGISTRY[key]
+                break
+        if sanitiser is not None:
+            break
+
+    _RESOLVED[data_type] = sanitiser
+    return sanitiser
+
+
+def pop_selection(kwargs):
+    """Remove and return the selection kwargs accepted by `select`."""
+    return {key: kwargs.pop(key) for key in SELECTION_KWARGS if key in kwargs}
+
+
+def select(data, sel=None, isel=None, mean_over=None, nearest=False):
+    """
+    Reduce an xarray object before any of its values are read.
+
+    Selections are applied lazily, so for file-backed or dask-backed data only
+    the selected slice is ever read.
+
+    Parameters
+    ----------
+    data : xarray.DataArray or xarray.Dataset
+        The data to reduce.
+    sel : dict (optional)
+        Coordinate labels to select, passed to `sel`.
+    isel : dict (optional)
+        Integer indices to select, passed to `isel`.
+    mean_over : str or list of str (optional)
+        Dimensions to average over after selecting, e.g. to compute an area
+        mean.
+    nearest : bool (optional)
+        If `True`, scalar and array `sel` labels on numeric or datetime
+        coordinates select the nearest coordinate value (e.g. the nearest grid
+        point to a location); other labels (e.g. station names) and slices
+        are still selected exactly. Default is `False`, in which case labels
+        must match exactly, as for `xarray.DataArray.sel`.
+    """
+    if isel:
+        data = data.isel(isel)
+    if sel and nearest:
+        closest = {
+            dim: value
+            for dim, value in sel.items()
+            if not isinstance(value, slice) and _is_continuous(data, dim)
+        }
+        exact = {dim: value for dim, value in sel.items() if dim not in closest}
+        if exact:
+            data = data.sel(exact)
+        if closest:
+            data = data.sel(closest, method="nearest")
+    elif sel:
+        data = data.sel(sel)
+    if mean_over:
+        data = data.mean(mean_over, keep_attrs=True)
+    return data
+
+
+def _is_continuous(data, dim):
+    # Nearest-neighbour lookup needs coordinates that can be subtracted
+    return dim in data.indexes and data.indexes[dim].dtype.kind in "iufcmM"
+
+
+def open_dataset(data, **selection):
+    """
+    Open `data` as an `xarray.Dataset`, reusing previously opened sources, and
+    reduce it with `select`.
+    """
+    if not is_dataset(data):
+        data = sources.open_dataset(data)
+    return select(data, **selection)
+
+
+def is_dataset(data):
+    """Check whether `data` is an (already open) `xarray.Dataset`."""
+    xr = sys.modules.get("xarray")
+    return xr is not None and isinstance(data, xr.Dataset)
+
+
+def is_source(data):
+    """Check whether `data` is a file to open or an `xarray.Dataset`."""
+    return isinstance(data, (str, os.PathLike)) or is_dataset(data)
+
+
+def open_dataarray(data, variable=None, **selection):
+    """
+    Open `data` as a single `xarray.DataArray`, reduced with `select`.
+
+    Parameters
+    ----------
+    data : xarray.DataArray, xarray.Dataset or str
+        The data, or a file to open.
+    variable : str (optional)
+        The data variable to take from a dataset or file; default is the first
+        data variable.
+    """
+    if metadata.is_dataarray(data):
+        return select(data, **selection)
+    dataset = open_dataset(data, **selection)
+    return metadata.split_variables(dataset, variable or list(dataset.data_vars)[:1])[0]
 
 
 def discard_input_only_kwargs(function):
@@ -38,17 +207,28 @@ def discard_input_only_kwargs(function):
     return wrapper
 
 
+# xarray types are registered by name so that xarray (and emohawk) are only
+# imported once an xarray-like input is actually plotted
+@register("xarray.core.dataarray.DataArray", "xarray.core.dataset.Dataset", str)
 @discard_input_only_kwargs
 def xarray(self, data, args, kwargs):
-    try:
-        dataset = xr.Dataset(emohawk.open(data).to_xarray()).squeeze()
-    except (NotImplementedError, ValueError):
-        return None
+    if is_dataset(data):
+        # Already open, e.g. the per-variable datasets of `add_traces_from`
+        dataset = data
+    else:
+        try:
+            with profiling.stage("open", self):
+                dataset = sources.open_dataset(data)
+        except (NotImplementedError, ValueError):
+            return None
+
+    dataset = select(dataset, **pop_selection(kwargs)).squeeze()
 
     if len(dataset.dims) != 1:
         raise ValueError(
             f"data must have exactly 1 dimension, but found "
-            f"{len(dataset.dims)}; please reduce the data down to 1 dimension"
+            f"{len(dataset.dims)}; please reduce the data down to 1 dimension, "
+            f"e.g. with the `sel`, `isel` or `mean_over` arguments"
         )
     dim = list(dataset.dims)[0]
 
@@ -95,12 +275,19 @@ def xarray(self, data, args, kwargs):
     return args, kwargs
 
 
+@register(np.ndarray, list)
 @discard_input_only_kwargs
 def numpy(self, data, args, kwargs):
-    try:
-        ndarray = emohawk.open(data).to_numpy()
-    except (NotImplementedError, ValueError):
-        return None
+    if isinstance(data, (np.ndarray, list)):
+        ndarray = np.asarray(data)
+    else:
+        import emohawk
+
+        try:
+            with profiling.stage("open", self):
+                ndarray = emohawk.open(data).to_numpy()
+        except (NotImplementedError, ValueError):
+            return None
 
     x = kwargs.get("x")
     y = kwargs.get("y")
@@ -128,9 +315,18 @@ def numpy(self, data, args, kwargs):
 
     kwargs = {**kwargs, **{"x": x, "y": y}}
 
+    hovertemplate = kwargs.get("hovertemplate")
+    if hovertemplate is not None:
+        if "{axis}" in hovertemplate:
+            hovertemplate = hovertemplate.format(axis="y")
+        for axis in self.AXES:
+            hovertemplate = hovertemplate.replace(f"%{{{axis}units}}", "")
+        kwargs["hovertemplate"] = hovertemplate
+
     return args, kwargs
 
 
+@register(type(None))
 @discard_input_only_kwargs
 def plotly(self, data, args, kwargs):
     transformed_axes = []
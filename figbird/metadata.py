@@ -6,6 +6,8 @@
 # granted to it by virtue of its status as an intergovernmental organisation
 # nor does it submit to any jurisdiction.
 
+import sys
+
 LABEL_PREFERENCE = [
     "long_name",
     "name",
@@ -15,6 +17,17 @@ LABEL_PREFERENCE = [
 ]
 
 
+def is_dataarray(data):
+    """
+    Check whether `data` is an `xarray.DataArray`, without importing xarray.
+
+    If xarray has not been imported yet then `data` cannot be a `DataArray`,
+    so plotting plain numpy input never pays the cost of importing xarray.
+    """
+    xr = sys.modules.get("xarray")
+    return xr is not None and isinstance(data, xr.DataArray)
+
+
 def get_axis_title(data, attr=None):
     title = get_label(data, attr) or str()
     units = get_units(data, attr)
@@ -53,6 +66,14 @@ def split_dim(dataarray, dim):
     return dataarray
 
 
+def split_variables(dataset, variables="all"):
+    if variables == "all":
+        variables = list(dataset.data_vars)
+    elif isinstance(variables, str):
+        variables = [variables]
+    return [dataset[variable] for variable in variables]
+
+
 def dim_labels(dataarray, dim):
-    labels = [f"{dim}={value}" for value in dataarray[dim].values()]
+    labels = [f"{dim}={value}" for value in dataarray[dim].values]
     return labels
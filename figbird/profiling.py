@@ -0,0 +1,154 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+"""
+Module for timing the stages of figure construction.
+
+Instrumentation is disabled unless a `profile` context is active, in which case
+each instrumented stage records its wall time and call count, both overall and
+per figure. When disabled, each instrumented call costs a single context
+variable lookup.
+
+Example
+-------
+>>> import figbird
+>>> with figbird.profile() as profile:
+...     fig = figbird.line([1, 2, 3])
+...     _ = fig.to_json()
+>>> sorted(profile.to_dict()["stages"])  # doctest: +SKIP
+['add_trace', 'build_trace', 'sanitise', 'schema', 'serialise']
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import threading
+import time
+import weakref
+
+_ACTIVE = contextvars.ContextVar("figbird_profile", default=None)
+
+
+class Profile:
+    """Accumulated wall time and call counts per stage and per figure."""
+
+    def __init__(self):
+        self.stages = dict()
+        self.figures = dict()
+        self._figure_labels = dict()
+        self._figure_count = 0
+        self._lock = threading.Lock()
+
+    def record(self, name, elapsed, figure=None):
+        with self._lock:
+            _accumulate(self.stages, name, elapsed)
+            if figure is not None:
+                label = self._figure_label(figure)
+                _accumulate(self.figures.setdefault(label, dict()), name, elapsed)
+
+    def _figure_label(self, figure):
+        # The id of a figure is only unique while the figure is alive, so
+        # check the figure is still the same before reusing its label
+        reference, label = self._figure_labels.get(id(figure), (None, None))
+        if reference is None or reference() is not figure:
+            label = f"figure {self._figure_count}"
+            self._figure_count += 1
+            self._figure_labels[id(figure)] = (weakref.ref(figure), label)
+        return label
+
+    def to_dict(self):
+        """
+        Export the recorded timings.
+
+        Returns
+        -------
+        dict
+            A dictionary with a `"stages"` entry mapping each stage name to
+            its call `count`, `total` and `mean` wall time in seconds, and a
+            `"figures"` entry with the same statistics for each figure.
+        """
+        with self._lock:
+            return {
+                "stages": _summarise(self.stages),
+                "figures": {
+                    label: _summarise(stages) for label, stages in self.figures.items()
+                },
+            }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+
+@contextlib.contextmanager
+def profile():
+    """
+    Record timings for all instrumented stages run within this context.
+
+    Yields
+    ------
+    Profile
+    """
+    active = Profile()
+    token = _ACTIVE.set(active)
+    try:
+        yield active
+    finally:
+        _ACTIVE.reset(token)
+
+
+@contextlib.contextmanager
+def stage(name, figure=None):
+    """Time the enclosed block as stage `name` of `figure`, if profiling."""
+    active = _ACTIVE.get()
+    if active is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        active.record(name, time.perf_counter() - start, figure)
+
+
+def timed(name, method=False):
+    """
+    Decorate a function to be timed as stage `name`, if profiling.
+
+    If `method` is `True`, the first argument is treated as the figure to
+    which the stage belongs.
+    """
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            active = _ACTIVE.get()
+            if active is None:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                figure = args[0] if method else None
+                active.record(name, time.perf_counter() - start, figure)
+
+        return wrapper
+
+    return decorator
+
+
+def _accumulate(stages, name, elapsed):
+    count, total = stages.get(name, (0, 0.0))
+    stages[name] = (count + 1, total + elapsed)
+
+
+def _summarise(stages):
+    return {
+        name: {"count": count, "total": total, "mean": total / count}
+        for name, (count, total) in stages.items()
+    }
@@ -7,17 +7,38 @@
 # nor does it submit to any jurisdiction.
 
 import collections.abc
+import contextvars
+import types
 from string import Formatter
 
+from . import profiling
+
+#: Temporary overrides made with `Schema.set`, as a mapping from the id of each
+#: overridden schema to its overridden keys. Overrides are scoped to the
+#: current context (i.e. thread or asyncio task), so concurrent figures never
+#: see each other's overrides. The mapping is never modified in place; each
+#: `set` replaces it with an updated copy.
+_OVERRIDES = contextvars.ContextVar("figbird_schema_overrides", default=dict())
+
+#: The number of override scopes for which each schema keeps a compiled copy,
+#: so that code alternating between a few scopes does not recompile each time.
+_COMPILED_SCOPES = 8
+
 
 class Schema(dict):
+
+    #: Global modification counter, incremented whenever any schema changes.
+    #: Since format strings can reference any part of the global schema, a
+    #: compiled schema is only valid for the version at which it was compiled.
+    _version = 0
+
     def __init__(self, **kwargs):
         self.update(**kwargs)
 
     def __getattr__(self, key):
         schema, key = self.magic_key(key)
-        if key in schema:
-            value = schema[key]
+        if schema._contains(key):
+            value = schema._lookup(key)
             return self._format_string(value)
         raise AttributeError(key)
 
@@ -35,6 +56,19 @@ class Schema(dict):
         except KeyError:
             raise AttributeError(key)
 
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._invalidate()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._invalidate()
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._invalidate()
+        return value
+
     def __repr__(self):
         return f"{self.__class__.__name__}({super().__repr__()})"
 
@@ -51,21 +85,75 @@ class Schema(dict):
 
         return decorator
 
+    @profiling.timed("schema")
     def _update_kwargs(self, kwargs):
-        return _recursive_dict_update(self.to_dict(), kwargs)
+        return recursive_dict_update(self.to_dict(), kwargs)
+
+    def _invalidate(self):
+        Schema._version += 1
+
+    def compile(self):
+        """
+        Resolve this schema into a read-only mapping of plain values.
+
+        All format strings are evaluated and nested schemas are compiled
+        recursively. The result is cached, separately for each set of active
+        overrides, until any schema is modified.
+
+        Returns
+        -------
+        types.MappingProxyType
+        """
+        overrides = _OVERRIDES.get()
+        version, scopes = self.__dict__.get("_compiled", (None, None))
+        if version != Schema._version or len(scopes) >= _COMPILED_SCOPES:
+            scopes = dict()
+            self.__dict__["_compiled"] = (Schema._version, scopes)
+
+        # Each override scope is a distinct mapping, kept alive by its entry
+        scope, compiled = scopes.get(id(overrides), (None, None))
+        if scope is not overrides:
+            d = dict()
+            for key in self._keys():
+                value = getattr(self, key)
+                if isinstance(value, Schema):
+                    value = value.compile()
+                d[key] = value
+            compiled = types.MappingProxyType(d)
+            scopes[id(overrides)] = (overrides, compiled)
+        return compiled
 
     def to_dict(self):
-        d = dict()
-        for key in self:
-            value = getattr(self, key)
-            if isinstance(value, type(self)):
-                value = value.to_dict()
-            d[key] = value
-        return d
+        return _thaw(self.compile())
 
     def set(self, **kwargs):
+        """
+        Temporarily override schema values, for use as a context manager.
+
+        Overrides only apply within the current context (i.e. the current
+        thread or asyncio task), so figures can safely be built in parallel.
+
+        Example
+        -------
+        >>> with schema.settings.set(hoverprecision=".3f"):
+        ...     schema.settings.hoverprecision
+        '.3f'
+        """
         return _set(self, **kwargs)
 
+    def _lookup(self, key):
+        overrides = _OVERRIDES.get().get(id(self))
+        if overrides is not None and key in overrides:
+            return overrides[key]
+        return self[key]
+
+    def _contains(self, key):
+        return key in self or key in _OVERRIDES.get().get(id(self), ())
+
+    def _keys(self):
+        overrides = _OVERRIDES.get().get(id(self), ())
+        return list(self) + [key for key in overrides if key not in self]
+
     def get(self, key):
         value = getattr(self, key)
         value = self._format_string(value)
@@ -73,16 +161,16 @@ class Schema(dict):
 
     def _get_magic_key(self, key):
         magic_key, *kwarg = key.split("_")
-        if magic_key in self:
+        if self._contains(magic_key):
             return magic_key, "_".join(kwarg)
         else:
             raise AttributeError(f"{self.__class__.__name__} has no attribute {key}")
 
     def magic_key(self, key):
-        if key in self:
+        if self._contains(key):
             return self, key
         magic_key, kwarg = self._get_magic_key(key)
-        return self[magic_key], kwarg
+        return self._lookup(magic_key), kwarg
 
     def _format_string(self, value):
         if isinstance(value, str) and "{" in value:
@@ -107,40 +195,38 @@ class Schema(dict):
 class _set:
     def __init__(self, schema, **kwargs):
         self.schema = schema
-
-        keys = [
-            self.schema._get_magic_key(key)[0]
-            for key in kwargs
-            if key not in self.schema
-        ]
-        keys += [key for key in kwargs if key in self.schema]
-
-        self.old_kwargs = {key: self.schema.get(key) for key in keys}
-        self.old_kwargs = {
-            **self.old_kwargs,
-            **{
-                key: dict(value)
-                for key, value in self.old_kwargs.items()
-                if isinstance(value, Schema)
-            },
-        }
-
-        self.new_kwargs = [key for key in kwargs if key not in self.schema]
-        self.schema.update(**kwargs)
+        self.kwargs = kwargs
+        self.token = None
 
     def __enter__(self):
+        overrides = dict(_OVERRIDES.get())
+        for key, value in self.kwargs.items():
+            if isinstance(value, dict) and not isinstance(value, Schema):
+                value = Schema(**value)
+            try:
+                target, key = self.schema.magic_key(key)
+            except AttributeError:
+                target = self.schema
+            overrides[id(target)] = {**overrides.get(id(target), dict()), key: value}
+        self.token = _OVERRIDES.set(overrides)
         return self
 
     def __exit__(self, type, value, traceback):
-        self.schema.update(**self.old_kwargs)
-        for key in self.new_kwargs:
-            self.schema.pop(key, None)
+        _OVERRIDES.reset(self.token)
+
+
+def _thaw(mapping):
+    return {
+        key: _thaw(value) if isinstance(value, types.MappingProxyType) else value
+        for key, value in mapping.items()
+    }
 
 
-def _recursive_dict_update(d, u):
+def recursive_dict_update(d, u):
+    """Recursively update the nested dictionary `d` with `u`, in place."""
     for k, v in u.items():
         if isinstance(v, collections.abc.Mapping):
-            d[k] = _recursive_dict_update(d.get(k, {}), v)
+            d[k] = recursive_dict_update(d.get(k, {}), v)
         else:
             d[k] = v
     return d
@@ -151,8 +237,25 @@ schema = Schema(
         "settings": {
             "hoverprecision": ".1f",
             "line": {
-                # TODO: Make this work!
-                "marker_threshold": 60,
+                # Draw markers on lines with at most this many points, unless a
+                # mode is given; None (default) never draws them
+                "marker_threshold": None,
+            },
+            "aggregation": {
+                # Maximum number of stripes columns with `aggregate="auto"`
+                "columns": 500,
+            },
+            "decimation": {
+                "method": "minmax",
+                "width": 1000,
+            },
+            "sources": {
+                # Number of opened files and datasets to keep in memory
+                "cache_size": 16,
+            },
+            "webgl": {
+                # Switch to WebGL rendering above this many points per figure
+                "threshold": 20000,
             },
             "auto_label_axes": True,
             "hovertemplate": "%{{{{{{axis}}:{settings.hoverprecision}}}}}%{{{{{{axis}}units}}}}",
@@ -210,7 +313,8 @@ schema = Schema(
                 "width": 2,
                 "shape": "linear",
             },
-            "mode": "lines",
+            # Chosen from settings.line.marker_threshold if not given
+            "mode": None,
             "hovertemplate": "{settings.hovertemplate}",
             "marker": {
                 "size": 6,
@@ -227,6 +331,14 @@ schema = Schema(
             "showscale": False,
             "hovertemplate": "%{{x}}: %{{z:{settings.hoverprecision}}}<extra></extra>",
         },
+        "ensemble": {
+            "line": {
+                "width": 1,
+                "shape": "{line.line.shape}",
+            },
+            "hovertemplate": "{line.hovertemplate}<extra>%{{{{customdata}}}}</extra>",
+            "mode": "lines",
+        },
         "envelope": {
             "line": {
                 "shape": "{line.line.shape}",
@@ -0,0 +1,131 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+"""
+Cache of opened input sources.
+
+Opening a GRIB or NetCDF file with emohawk and wrapping it in an
+`xarray.Dataset` is by far the slowest part of plotting file input, and the
+same file is often plotted several times (e.g. once per variable, or once per
+envelope bound). Opened sources are therefore kept in a small least-recently-
+used cache, bounded by `schema.settings.sources.cache_size`.
+
+Example
+-------
+>>> from figbird import sources
+>>> sources.clear()
+>>> len(sources.cache)
+0
+"""
+
+import collections
+import os
+import threading
+
+from .schema import schema
+
+
+class SourceCache:
+    """
+    Least-recently-used cache of opened sources.
+
+    File paths are keyed on their resolved location, modification time and
+    size, so that a file is re-opened once it changes on disk. Any other input,
+    such as an xarray object that is already open, is passed straight to the
+    opener and never cached, so that in-place changes to it are always seen
+    and temporary objects never evict files.
+
+    Parameters
+    ----------
+    maxsize : int (optional)
+        The maximum number of cached sources; if not given, the current value
+        of `schema.settings.sources.cache_size` is used. A size of 0 disables
+        the cache.
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, data, opener):
+        """
+        Get the opened `data`, calling `opener(data)` if it is not cached.
+
+        Errors raised by `opener` are propagated and never cached.
+        """
+        key = _key(data)
+        if key is None:
+            return opener(data)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        # Open outside the lock, so that slow opens do not block each other
+        opened = opener(data)
+
+        with self._lock:
+            self.misses += 1
+            maxsize = self.maxsize
+            if maxsize is None:
+                maxsize = schema.settings.sources.cache_size
+            if maxsize > 0:
+                self._entries[key] = opened
+                self._entries.move_to_end(key)
+                while len(self._entries) > maxsize:
+                    self._entries.popitem(last=False)
+        return opened
+
+    def clear(self):
+        """Drop all cached sources and reset the hit and miss counts."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def _key(data):
+    if isinstance(data, (str, os.PathLike)):
+        try:
+            stat = os.stat(data)
+        except (OSError, ValueError):
+            # Not a local file (e.g. a URL), so changes cannot be detected
+            return None
+        return (os.path.realpath(data), stat.st_mtime_ns, stat.st_size)
+    return None
+
+
+def _open_dataset(data):
+    import emohawk
+    import xarray as xr
+
+    return xr.Dataset(emohawk.open(data).to_xarray())
+
+
+cache = SourceCache()
+
+
+def open_dataset(data):
+    """
+    Open `data` with emohawk as an `xarray.Dataset`, reusing the cached
+    dataset if the same source has already been opened.
+    """
+    return cache.get(data, _open_dataset)
+
+
+def clear():
+    """Clear the cache of opened sources."""
+    cache.clear()
@@ -0,0 +1,57 @@
+/*
+ * (C) Copyright 2022 ECMWF.
+ *
+ * This software is licensed under the terms of the Apache Licence Version 2.0
+ * which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+ * In applying this licence, ECMWF does not waive the privileges and immunities
+ * granted to it by virtue of its status as an intergovernmental organisation
+ * nor does it submit to any jurisdiction.
+ */
+
+/*
+ * Loader for figures exported by figbird with `to_json(binary=True,
+ * deduplicate=True)`, in which arrays shared by several traces are written
+ * once in a top-level "arrays" list and replaced in each trace with a
+ * {"ref": index} object.
+ *
+ *     figbird.newPlot(div, figure, config);
+ *
+ * is equivalent to
+ *
+ *     figure = figbird.resolve(figure);
+ *     Plotly.newPlot(div, figure.data, figure.layout, config);
+ */
+(function (root) {
+  "use strict";
+
+  function isReference(value) {
+    return (
+      value !== null &&
+      typeof value === "object" &&
+      Object.keys(value).length === 1 &&
+      typeof value.ref === "number"
+    );
+  }
+
+  function resolve(figure) {
+    var arrays = figure.arrays || [];
+    (figure.data || []).forEach(function (trace) {
+      Object.keys(trace).forEach(function (key) {
+        if (isReference(trace[key])) {
+          // Give each trace its own (shallow) copy of the specification, in
+          // case plotly.js decodes it in place
+          trace[key] = Object.assign({}, arrays[trace[key].ref]);
+        }
+      });
+    });
+    delete figure.arrays;
+    return figure;
+  }
+
+  function newPlot(div, figure, config) {
+    figure = resolve(figure);
+    return root.Plotly.newPlot(div, figure.data, figure.layout, config);
+  }
+
+  root.figbird = { resolve: resolve, newPlot: newPlot };
+})(typeof self !== "undefined" ? self : this);
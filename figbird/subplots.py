@@ -0,0 +1,205 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import numpy as np
+
+from . import inputs, keywords, metadata
+from .schema import recursive_dict_update
+
+COLOR_KWARGS = {
+    "line": "line_color",
+    "scatter": "marker_color",
+    "bar": "marker_color",
+}
+
+
+def add_facets(
+    self,
+    data,
+    *args,
+    row=None,
+    col=None,
+    trace_type="line",
+    variable=None,
+    **kwargs,
+):
+    """
+    Plot small multiples of N-dimensional data on a grid of subplots.
+
+    Each panel shows one slice of `data` along the `row` and `col` dimensions,
+    with shared axes and the figure's schema styling applied to every panel.
+    The data is read once and split with a single transpose rather than one
+    selection per panel, and all panel traces are added in one batch.
+
+    Parameters
+    ----------
+    data : xarray.DataArray or xarray.Dataset or str
+        The data to plot, which must reduce to one dimension per panel. Any
+        `sel`, `isel` or `mean_over` selection is applied first; see
+        `figbird.inputs.select`.
+    row : str (optional)
+        The dimension to split over the rows of the grid.
+    col : str (optional)
+        The dimension to split over the columns of the grid.
+    trace_type : str (optional)
+        The type of trace to add in each panel, i.e. the suffix of an `add_*`
+        method; default is `"line"`.
+    variable : str (optional)
+        The data variable to plot if `data` is a dataset or file; default is
+        the first data variable.
+    """
+    facet_dims = [dim for dim in (row, col) if dim is not None]
+    if not facet_dims:
+        raise ValueError("at least one of 'row' or 'col' must be given")
+
+    data = inputs.open_dataarray(data, variable, **inputs.pop_selection(kwargs))
+
+    for dim in facet_dims:
+        if dim not in data.dims:
+            raise ValueError(
+                f"facet dimension '{dim}' not found in data dimensions {data.dims}"
+            )
+
+    data = data.transpose(*facet_dims, ...)
+    panel_dims = data.dims[len(facet_dims) :]
+    values = data.values
+    if row is None:
+        values = values[np.newaxis]
+    elif col is None:
+        values = values[:, np.newaxis]
+    n_rows, n_cols = values.shape[:2]
+
+    row_labels = metadata.dim_labels(data, row) if row is not None else [None]
+    col_labels = metadata.dim_labels(data, col) if col is not None else [None]
+    titles = [
+        ", ".join(label for label in (row_label, col_label) if label)
+        for row_label in row_labels
+        for col_label in col_labels
+    ]
+    schema_layout = self._schema.to_dict().get("layout", dict())
+    grid = grid_layout(
+        n_rows,
+        n_cols,
+        titles=titles,
+        xaxis=schema_layout.get("xaxis"),
+        yaxis=schema_layout.get("yaxis"),
+        x_title=metadata.get_axis_title(data, panel_dims[0]) if panel_dims else "",
+        y_title=metadata.get_axis_title(data),
+    )
+    # Assigning the merged layout in one go is much faster than update_layout,
+    # which validates each of the many axis properties separately
+    layout = self.layout.to_plotly_json()
+    grid["annotations"] = list(layout.get("annotations", ())) + grid["annotations"]
+    self.layout = recursive_dict_update(layout, grid)
+
+    # Panels share one template, so that each only needs its values swapped in
+    template = data.isel({dim: 0 for dim in facet_dims}).reset_coords(drop=True)
+
+    color_kwarg = COLOR_KWARGS.get(trace_type)
+    if color_kwarg is not None and keywords.get(color_kwarg, kwargs) is None:
+        kwargs[color_kwarg] = self.next_color()
+    kwargs.setdefault("name", metadata.get_label(data) or f"trace {self._trace_count}")
+    kwargs.setdefault("legendgroup", kwargs["name"])
+
+    add_trace = getattr(self, f"add_{trace_type}")
+    with self.batch_traces():
+        for i in range(n_rows):
+            for j in range(n_cols):
+                axis = axis_suffix(i * n_cols + j)
+                add_trace(
+                    template.copy(data=values[i, j]),
+                    *args,
+                    **{
+                        "showlegend": i == j == 0,
+                        **kwargs,
+                        "xaxis": f"x{axis}",
+                        "yaxis": f"y{axis}",
+                    },
+                )
+    return self
+
+
+def grid_layout(
+    n_rows, n_cols, titles=None, xaxis=None, yaxis=None, x_title="", y_title=""
+):
+    """
+    Build the layout of a grid of subplots with shared axes, numbered from the
+    top-left panel in row-major order.
+
+    This matches the layout of `plotly.subplots.make_subplots` with shared axes
+    and default spacing, but is built as a single dictionary so that the whole
+    grid can be applied in one layout update.
+
+    Parameters
+    ----------
+    titles : list of str (optional)
+        A title for each panel.
+    xaxis, yaxis : dict (optional)
+        Styling for every x or y axis.
+    x_title, y_title : str (optional)
+        Titles for the x axes of the bottom row and the y axes of the left
+        column.
+    """
+    xaxis = xaxis or dict()
+    yaxis = yaxis or dict()
+
+    horizontal_spacing = 0.2 / n_cols
+    vertical_spacing = (0.5 if titles else 0.3) / n_rows
+    width = (1 - horizontal_spacing * (n_cols - 1)) / n_cols
+    height = (1 - vertical_spacing * (n_rows - 1)) / n_rows
+
+    layout = {"annotations": []}
+    for i in range(n_rows):
+        top = 1 - i * (height + vertical_spacing)
+        for j in range(n_cols):
+            left = j * (width + horizontal_spacing)
+            axis = axis_suffix(i * n_cols + j)
+            bottom_axis = axis_suffix((n_rows - 1) * n_cols + j)
+            left_axis = axis_suffix(i * n_cols)
+            layout[f"xaxis{axis}"] = {
+                **xaxis,
+                "domain": [max(left, 0), min(left + width, 1)],
+                "anchor": f"y{axis}",
+                "title": {"text": x_title if i == n_rows - 1 else ""},
+                **(
+                    {"matches": f"x{bottom_axis}", "showticklabels": False}
+                    if i < n_rows - 1
+                    else dict()
+                ),
+            }
+            layout[f"yaxis{axis}"] = {
+                **yaxis,
+                "domain": [max(top - height, 0), min(top, 1)],
+                "anchor": f"x{axis}",
+                "title": {"text": y_title if j == 0 else ""},
+                **(
+                    {"matches": f"y{left_axis}", "showticklabels": False}
+                    if j > 0
+                    else dict()
+                ),
+            }
+            if titles:
+                layout["annotations"].append(
+                    {
+                        "text": titles[i * n_cols + j],
+                        "x": left + width / 2,
+                        "y": top,
+                        "xref": "paper",
+                        "yref": "paper",
+                        "xanchor": "center",
+                        "yanchor": "bottom",
+                        "showarrow": False,
+                        "font": {"size": 16},
+                    }
+                )
+    return layout
+
+
+def axis_suffix(index):
+    """The suffix of the axes of the subplot at `index`, e.g. `"2"` for `x2`."""
+    return str(index + 1) if index else ""
@@ -19,9 +19,9 @@ information aggregated over a series of years).
 """
 
 import warnings
-from datetime import datetime, timedelta
+from datetime import datetime
 
-from dateutil.relativedelta import relativedelta
+import numpy as np
 
 from ..schema import schema
 
@@ -29,6 +29,9 @@ from ..schema import schema
 #: "dummy" year to be used for all calendar datetimes.
 DUMMY_YEAR = 2
 
+#: The numpy datetime type produced by all calendar transformers.
+DATETIME_DTYPE = "datetime64[ms]"
+
 
 MONTH_MIDPOINTS = {
     1: {"day": 16, "hour": 12},  # January
@@ -49,12 +52,64 @@ MONTH_MIDPOINTS = {
 DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 
-def season_to_datetime(season, year=DUMMY_YEAR):
+def datetime64(year, month, day=1, hour=0):
+    """
+    Build an array of datetimes from arrays of datetime components.
+
+    Parameters
+    ----------
+    year, month, day, hour : int or array-like
+        Datetime components, broadcast against each other.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of `datetime64[ms]` values.
+    """
+    year, month, day, hour = (
+        np.asarray(component, dtype="int64") for component in (year, month, day, hour)
+    )
+    months = (year - 1970).astype("datetime64[Y]") + (month - 1).astype(
+        "timedelta64[M]"
+    )
+    return (
+        months.astype(DATETIME_DTYPE)
+        + (day - 1).astype("timedelta64[D]")
+        + hour.astype("timedelta64[h]")
+    )
+
+
+def add_months(array, months):
+    """
+    Shift an array of datetimes by a number of calendar months, preserving the
+    day of the month and time of day.
+
+    Calendar datetimes never fall beyond the 28th day of a month, so unlike
+    `dateutil.relativedelta` no clipping to the end of the month is needed.
+    """
+    month_start = array.astype("datetime64[M]")
+    offset = array - month_start.astype(DATETIME_DTYPE)
+    shifted = month_start + np.timedelta64(months, "M")
+    return shifted.astype(DATETIME_DTYPE) + offset
+
+
+MONTH_MIDPOINT_DATETIMES = datetime64(
+    DUMMY_YEAR,
+    list(range(13)),
+    day=[1] + [MONTH_MIDPOINTS[month]["day"] for month in range(1, 13)],
+    hour=[0] + [MONTH_MIDPOINTS[month]["hour"] for month in range(1, 13)],
+)
+
+
+def season_to_month(season):
     superstring = "JFMAMJJASOND" * 2
-    if season not in superstring:
+    if not isinstance(season, str) or season not in superstring:
         raise ValueError(f"invalid season '{season}'")
+    return (superstring.index(season) + len(season) // 2) % 12 + 1
+
 
-    month = (superstring.index(season) + len(season) // 2) % 12 + 1
+def season_to_datetime(season, year=DUMMY_YEAR):
+    month = season_to_month(season)
     kwargs = {"day": 1, "hour": 0}
     if len(season) % 2:
         kwargs = MONTH_MIDPOINTS[month]
@@ -62,6 +117,22 @@ def season_to_datetime(season, year=DUMMY_YEAR):
     return datetime(year, month, **kwargs)
 
 
+def seasons_to_datetime64(array, year=DUMMY_YEAR):
+    """
+    Vectorized equivalent of `season_to_datetime` for arrays of seasons.
+
+    Each distinct season is only parsed once, regardless of the array length.
+    """
+    seasons, inverse = np.unique(np.asarray(array, dtype=str), return_inverse=True)
+    months = np.array([season_to_month(season) for season in seasons], dtype=int)
+    odd = np.array([len(season) % 2 for season in seasons], dtype=bool)
+    midpoints = MONTH_MIDPOINT_DATETIMES[months] - datetime64(DUMMY_YEAR, months)
+    datetimes = datetime64(year, months) + np.where(
+        odd, midpoints, np.timedelta64(0, "ms")
+    )
+    return datetimes[inverse.reshape(-1)]
+
+
 def update_layout(self, axis):
     calendar_layout = {
         f"{axis}axis": {
@@ -80,59 +151,55 @@ def update_layout(self, axis):
     self.update_layout(**calendar_layout)
 
 
+def cyclic_extend(array, offset, name, lengths):
+    """
+    Pad a calendar axis with one step before its start and after its end.
+
+    `offset` is either a `numpy.timedelta64` or an integer number of months.
+    """
+    if len(array) in lengths:
+        if isinstance(offset, int):
+            start, end = add_months(array[:1], -offset), add_months(array[-1:], offset)
+        else:
+            start, end = array[:1] - offset, array[-1:] + offset
+        array = np.concatenate((start, array, end))
+    else:
+        lengths = " or ".join(str(length) for length in lengths)
+        warnings.warn(
+            f"cyclic {name} axis must have length {lengths} but got "
+            f"{len(array)}; plotting raw data without cyclic extensions"
+        )
+    return array
+
+
 def dayofyear(array, cyclic=False):
-    array = [datetime(DUMMY_YEAR, 1, 1) + timedelta(days=int(day)) for day in array]
+    days = np.asarray(array).astype("int64")
+    array = datetime64(DUMMY_YEAR, 1, day=days + 1)
     if cyclic:
-        if len(array) in (365, 366):
-            offset = timedelta(days=1)
-            array = [array[0] - offset] + array + [array[-1] + offset]
-        else:
-            warnings.warn(
-                f"cyclic dayofyear axis must have length 365 or 366 but got "
-                f"{len(array)}; plotting raw data without cyclic extensions"
-            )
+        array = cyclic_extend(array, np.timedelta64(1, "D"), "dayofyear", (365, 366))
     return array
 
 
 def weekofyear(array, cyclic=False):
-    array = [datetime(2, 1, 1) + timedelta(days=int(week) * 7 - 3.5) for week in array]
+    weeks = np.asarray(array).astype("int64")
+    # Weeks are centred on their midpoint, 3.5 days (84 hours) before week end
+    array = datetime64(DUMMY_YEAR, 1, hour=weeks * 7 * 24 - 84)
     if cyclic:
-        if len(array) in (52, 53):
-            offset = timedelta(days=7)
-            array = [array[0] - offset] + array + [array[-1] + offset]
-        else:
-            warnings.warn(
-                f"cyclic weekofyear axis must have length 52 or 53 but got "
-                f"{len(array)}; plotting raw data without cyclic extensions"
-            )
+        array = cyclic_extend(array, np.timedelta64(7, "D"), "weekofyear", (52, 53))
     return array
 
 
 def month(array, cyclic=False):
-    array = [datetime(DUMMY_YEAR, month, **MONTH_MIDPOINTS[month]) for month in array]
+    array = MONTH_MIDPOINT_DATETIMES[np.asarray(array).astype("int64")]
     if cyclic:
-        if len(array) == 12:
-            offset = timedelta(days=31)
-            array = [array[0] - offset] + array + [array[-1] + offset]
-        else:
-            warnings.warn(
-                f"cyclic month axis must have length 12 but got "
-                f"{len(array)}; plotting raw data without cyclic extensions"
-            )
+        array = cyclic_extend(array, np.timedelta64(31, "D"), "month", (12,))
     return array
 
 
 def season(array, cyclic=False):
-    array = [season_to_datetime(season) for season in array]
+    array = seasons_to_datetime64(array)
     if cyclic:
-        if len(array) == 4:
-            offset = relativedelta(months=3)
-            array = [array[0] - offset] + array + [array[-1] + offset]
-        else:
-            warnings.warn(
-                f"cyclic season axis must have length 4 but got "
-                f"{len(array)}; plotting raw data without cyclic extensions"
-            )
+        array = cyclic_extend(array, 3, "season", (4,))
     return array
 
 
@@ -152,6 +219,16 @@ def format_hovertemplate(hovertemplate):
     return hovertemplate.replace("%Y", "????")
 
 
+#: Season labels indexed by month number (January = 0).
+SEASON_LABELS = np.array(
+    ["Winter (DJF)"] * 2
+    + ["Spring (MAM)"] * 3
+    + ["Summer (JJA)"] * 3
+    + ["Autumn (SON)"] * 3
+    + ["Winter (DJF)"]
+)
+
+
 HOVERTEMPLATES = {
     "month": {
         "extra": "%{{{axis}|%B}}",
@@ -160,18 +237,15 @@ HOVERTEMPLATES = {
         "extra": "%{{{axis}|%-d %B}}",
     },
     "weekofyear": {
-        "customdata": lambda dates: [date - timedelta(days=3.5) for date in dates],
+        "customdata": lambda dates: (
+            np.asarray(dates, dtype=DATETIME_DTYPE) - np.timedelta64(84, "h")
+        ),
         "extra": "w/c %{customdata|%-d %B}",
     },
     "season": {
-        "customdata": lambda *args, **kwargs: [
-            "Autumn (SON)",
-            "Winter (DJF)",
-            "Spring (MAM)",
-            "Summer (JJA)",
-            "Autumn (SON)",
-            "Winter (DJF)",
-        ],
+        "customdata": lambda dates: SEASON_LABELS[
+            np.asarray(dates, dtype="datetime64[M]").astype("int64") % 12
+        ].tolist(),
         "extra": "%{customdata}",
     },
 }
@@ -200,10 +274,10 @@ def update_hovertemplate(name, axis, kwargs):
 
 
 DEFAULT_AXES = {
-    "dayofyear": list(range(1, 367)),
-    "weekofyear": list(range(1, 54)),
-    "month": list(range(1, 13)),
-    "season": list(range(1, 5)),
+    "dayofyear": np.arange(1, 367),
+    "weekofyear": np.arange(1, 54),
+    "month": np.arange(1, 13),
+    "season": np.arange(1, 5),
 }
 
 
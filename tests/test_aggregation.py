@@ -0,0 +1,55 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import numpy as np
+import pytest
+
+import figbird
+from figbird import aggregation
+
+
+def test_group_mean():
+    values = np.array([[1.0, 2.0, np.nan, 4.0, 5.0], [1.0, 1.0, 1.0, 1.0, np.nan]])
+    codes = np.array([0, 1, 0, 1, 2])
+    result = aggregation.group_mean(values, codes)
+    expected = np.array([[1.0, 3.0, 5.0], [1.0, 1.0, np.nan]])
+    assert np.array_equal(result, expected, equal_nan=True)
+
+
+def test_aggregate_calendar_periods():
+    x = np.arange("1999-12-30", "2001-01-02", dtype="datetime64[D]")
+    values = np.arange(len(x), dtype=float)
+
+    labels, result = aggregation.aggregate(x, values, "year")
+    assert list(labels) == ["1999", "2000", "2001"]
+    assert np.array_equal(result, [0.5, 184.5, 368.0])
+
+    labels, result = aggregation.aggregate(np.arange(1995, 2011), np.ones(16), "decade")
+    assert list(labels) == ["1990s", "2000s", "2010s"]
+
+    with pytest.raises(TypeError):
+        aggregation.aggregate(np.linspace(0, 1, 5), np.ones(5), "year")
+
+
+def test_aggregate_to_column_count():
+    x = np.arange(10)
+    labels, result = aggregation.aggregate(x, np.arange(10.0), 4)
+    assert list(labels) == ["0 – 2", "3 – 4", "5 – 7", "8 – 9"]
+    assert np.array_equal(result, [1, 3.5, 6, 8.5])
+
+    labels, result = aggregation.aggregate(x, np.arange(10.0), 20)
+    assert labels is x
+
+
+def test_stripes_aggregate():
+    x = np.arange("2000-01-01", "2003-01-01", dtype="datetime64[D]")
+    fig = figbird.stripes(np.arange(len(x), dtype=float), x=x, aggregate="year")
+    trace = fig.data[0]
+    assert list(trace.x) == ["2000", "2001", "2002"]
+    assert len(trace.z) == len(trace.y) == 3
+    assert trace.hovertemplate.startswith("%{x}:")
@@ -0,0 +1,81 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import asyncio
+import concurrent.futures
+import threading
+
+import numpy as np
+import pytest
+
+import figbird
+from figbird import aio
+from figbird.figures import Figure
+
+
+def test_gather():
+    async def build():
+        with figbird.schema.settings.set(hoverprecision=".3f"):
+            return await asyncio.gather(
+                aio.line(np.arange(3.0)),
+                aio.stripes(np.arange(4.0)),
+                aio.scatter([1, 2], fig=Figure()),
+            )
+
+    line, stripes, scatter = asyncio.run(build())
+    assert line.data[0].hovertemplate == "%{y:.3f}"
+    assert stripes.data[0].type == "heatmap"
+    assert scatter.data[0].mode == "markers"
+    with figbird.schema.settings.set(hoverprecision=".3f"):
+        assert line.to_json() == figbird.line(np.arange(3.0)).to_json()
+
+
+def test_cancel_waits_for_running_call():
+    started, release, finished = threading.Event(), threading.Event(), []
+
+    def slow():
+        started.set()
+        release.wait(5)
+        finished.append(True)
+
+    async def cancel():
+        task = asyncio.ensure_future(aio.run(slow))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        await asyncio.sleep(0.05)
+        assert not task.done()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert finished
+
+    asyncio.run(cancel())
+
+
+def test_cancel_drops_queued_call():
+    calls = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        block = executor.submit(threading.Event().wait, 0.2)
+
+        async def cancel():
+            task = asyncio.ensure_future(aio.run(calls.append, 1, executor=executor))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel())
+        block.result()
+    assert calls == []
+
+
+def test_process_executor():
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+        fig = asyncio.run(aio.bar([1.0, 2.0], executor=executor))
+    assert isinstance(fig, Figure)
+    assert list(fig.data[0].y) == [1.0, 2.0]
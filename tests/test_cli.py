@@ -0,0 +1,117 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import json
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from figbird import cli
+
+JOBS = {
+    "defaults": {"schema": {"settings": {"hoverprecision": ".3f"}}},
+    "jobs": [
+        {"name": "line", "plot": "line", "input": [1, 2, 3], "output": "a.json"},
+        {
+            "name": "overlay",
+            "traces": [
+                {"plot": "bar", "input": [1, 2, 3]},
+                {"plot": "scatter", "input": [3, 2, 1], "kwargs": {"name": "s"}},
+            ],
+            "schema": {"scatter": {"marker_size": 9}},
+            "output": "out/b.html",
+            "write": {"include_plotlyjs": False},
+        },
+        {
+            "name": "broken",
+            "plot": "stripes",
+            "input": "missing.nc",
+            "output": "c.json",
+        },
+    ],
+}
+
+
+def test_load(tmp_path):
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps(JOBS))
+    jobs = cli.load(str(path))
+
+    assert [job["name"] for job in jobs] == ["line", "overlay", "broken"]
+    assert jobs[0]["traces"] == [{"plot": "line", "input": [1, 2, 3]}]
+    assert jobs[1]["schema"] == {
+        "settings": {"hoverprecision": ".3f"},
+        "scatter": {"marker_size": 9},
+    }
+    assert jobs[1]["output"] == str(tmp_path / "out" / "b.html")
+    assert jobs[2]["traces"][0]["input"] == str(tmp_path / "missing.nc")
+
+    path.write_text(json.dumps({"jobs": [{"plot": "pie", "output": "a.json"}]}))
+    with pytest.raises(ValueError):
+        cli.load(str(path))
+
+
+def test_main(tmp_path, capsys):
+    yaml = pytest.importorskip("yaml")
+    path = tmp_path / "jobs.yaml"
+    path.write_text(yaml.safe_dump(JOBS))
+
+    status = cli.main(
+        [str(path), "--workers", "2", "--timings", str(tmp_path / "t.json")]
+    )
+    assert status == 1
+
+    figure = json.loads((tmp_path / "a.json").read_text())
+    assert figure["data"][0]["hovertemplate"] == "%{y:.3f}"
+    assert "<html>" in (tmp_path / "out" / "b.html").read_text()
+    assert not (tmp_path / "c.json").exists()
+
+    timings = {
+        job["name"]: job
+        for job in json.loads((tmp_path / "t.json").read_text())["jobs"]
+    }
+    assert timings["line"]["status"] == "ok"
+    assert timings["overlay"]["total"] >= timings["overlay"]["build"] > 0
+    assert timings["broken"]["status"] != "ok"
+    assert "3 jobs, 1 failed" in capsys.readouterr().out
+
+
+def test_main_envelope_from_file(tmp_path):
+    members = np.random.default_rng(0).random((5, 4))
+    xr.Dataset(
+        {"t2m": (("number", "time"), members)}, coords={"time": np.arange(4)}
+    ).to_netcdf(tmp_path / "ens.nc")
+    jobs = {
+        "jobs": [
+            {
+                "name": "envelope",
+                "traces": [
+                    {
+                        "plot": "envelope",
+                        "input": "ens.nc",
+                        "kwargs": {"dim": "number", "quantiles": [0, 0.5, 1]},
+                    },
+                    {
+                        "plot": "line",
+                        "input": "ens.nc",
+                        "kwargs": {"isel": {"number": 0}},
+                    },
+                ],
+                "output": "envelope.json",
+            }
+        ]
+    }
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps(jobs))
+
+    assert cli.main([str(path), "--workers", "1"]) == 0
+    figure = json.loads((tmp_path / "envelope.json").read_text())
+    assert len(figure["data"]) == 4
+    assert np.allclose(figure["data"][0]["y"], members.min(axis=0))
+    assert np.allclose(figure["data"][-1]["y"], members[0])
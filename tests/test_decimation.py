@@ -0,0 +1,77 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import numpy as np
+import pytest
+
+import figbird
+from figbird import decimation
+
+
+def series(n_points=10000):
+    y = np.sin(np.arange(n_points) / 100) + np.random.default_rng(0).random(n_points)
+    y[500:600] = np.nan
+    return np.arange(n_points), y
+
+
+@pytest.mark.parametrize("method", ["minmax", "lttb"])
+def test_decimation_keeps_extremes_and_gaps(method):
+    x, y = series()
+    indices = decimation.METHODS[method](x, y, 100)
+    assert len(indices) <= 2 * 100 + 4
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+    assert np.nanargmin(y) in indices and np.nanargmax(y) in indices
+    assert np.isnan(y[indices]).any()
+
+
+def test_decimate_kwargs():
+    x, y = series()
+    kwargs = decimation.decimate(
+        {"x": x, "y": y, "customdata": x * 2}, method="minmax", width=50
+    )
+    assert len(kwargs["x"]) == len(kwargs["y"]) == len(kwargs["customdata"])
+    assert np.array_equal(kwargs["customdata"], kwargs["x"] * 2)
+    assert kwargs["meta"] == {"original_point_count": len(y)}
+
+
+@pytest.mark.parametrize("method", ["minmax", "lttb"])
+def test_decimate_categorical_x(method):
+    _, y = series()
+    x = np.array([f"station {i}" for i in range(len(y))])
+    kwargs = decimation.decimate({"x": x, "y": y}, method=method, width=100)
+    assert len(kwargs["x"]) == len(kwargs["y"]) < len(y)
+    assert kwargs["x"][0] == "station 0"
+
+
+def test_decimate_short_series_unchanged():
+    kwargs = {"x": [0, 1, 2], "y": [1, 2, 3]}
+    assert decimation.decimate(kwargs) is kwargs
+
+
+def test_line_decimate():
+    _, y = series()
+    fig = figbird.line(y, decimate="lttb")
+    assert len(fig.data[0].y) < len(y)
+    assert fig.data[0].meta["original_point_count"] == len(y)
+
+
+def test_decimate_invalid_method():
+    _, y = series()
+    with pytest.raises(ValueError):
+        decimation.decimate({"y": y}, method="mean")
+
+
+def test_envelope_decimate_shares_points():
+    x, y = series()
+    bounds = [y - 1, np.roll(y, 2500), y + 1]
+    fig = figbird.envelope(bounds, decimate="minmax")
+    assert len(fig.data) == 3
+    assert len(fig.data[0].x) < len(y)
+    for trace in fig.data[1:]:
+        assert np.array_equal(trace.x, fig.data[0].x)
+    assert np.array_equal(fig.data[1].y, bounds[2][fig.data[1].x], equal_nan=True)
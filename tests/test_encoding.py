@@ -0,0 +1,127 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import json
+
+import numpy as np
+import pytest
+import xarray as xr
+
+import figbird
+from figbird import encoding
+
+
+def series():
+    return xr.DataArray(
+        np.array([1.5, np.nan, 3.0]),
+        dims=["time"],
+        coords={"time": np.array(["2000-01-01", "NaT", "2000-03-01"], "M8[ns]")},
+        name="t",
+        attrs={"units": "K"},
+    )
+
+
+@pytest.mark.parametrize(
+    "values, dtype",
+    [
+        (np.arange(3.0), "f8"),
+        (np.arange(3, dtype="float32"), "f4"),
+        (np.array([-1, 100]), "i1"),
+        (np.array([0, 200]), "u1"),
+        (np.array([0, 2**20]), "i4"),
+        (np.arange(6.0).reshape(2, 3), "f8"),
+    ],
+)
+def test_typed_array_round_trip(values, dtype):
+    spec = encoding.to_typed_array(values)
+    assert spec["dtype"] == dtype
+    assert ("shape" in spec) == (values.ndim > 1)
+    assert np.array_equal(encoding.from_typed_array(spec), values)
+
+
+def test_unsupported_arrays_are_unchanged():
+    values = np.array([0, 2**40])
+    assert encoding.to_typed_array(values) is values
+
+
+@pytest.mark.parametrize("engine", ["json", "orjson"])
+def test_to_json_round_trip(engine):
+    data = series()
+    fig = figbird.line(data)
+
+    string = fig.to_json(binary=True, engine=engine)
+    assert '"bdata"' in string
+
+    result = encoding.from_json(string)
+    assert result["layout"]["xaxis"]["type"] == "date"
+    (line,) = result["data"]
+    assert np.array_equal(line["x"], data.time.values, equal_nan=True)
+    assert np.array_equal(line["y"], data.values, equal_nan=True)
+
+    expected = json.loads(fig.to_json())
+    assert result["layout"]["template"] == expected["layout"]["template"]
+    assert line["hovertemplate"] == expected["data"][0]["hovertemplate"]
+
+
+def test_to_json_stripes():
+    data = np.arange(12.0).reshape(3, 4)
+    fig = figbird.stripes(xr.DataArray(data, dims=["row", "time"], name="t"), dim="row")
+    (stripes,) = encoding.from_json(fig.to_json(binary=True))["data"]
+    assert np.array_equal(stripes["z"], data)
+    assert stripes["z"].dtype == data.dtype
+
+
+def test_to_json_is_html_safe():
+    fig = figbird.line(np.arange(3.0), name="</script>")
+    assert "</script>" not in fig.to_json(binary=True)
+    assert "bdata" in fig.to_html(binary=True, include_plotlyjs=False)
+
+
+def test_to_json_deduplicate():
+    data = xr.DataArray(
+        np.random.default_rng(0).random((3, 10)),
+        dims=["number", "time"],
+        coords={"time": np.arange(10)},
+        name="t",
+    )
+    fig = figbird.envelope(data, dim="number")
+
+    figure = json.loads(fig.to_json(binary=True, deduplicate=True))
+    assert len(figure["arrays"]) == 1
+    assert all(trace["x"] == {"ref": 0} for trace in figure["data"])
+
+    result = encoding.from_json(fig.to_json(binary=True, deduplicate=True))
+    assert "arrays" not in result
+    for trace, expected in zip(result["data"], fig.data):
+        assert np.array_equal(trace["x"], expected.x)
+        assert np.array_equal(trace["y"], expected.y)
+
+    assert "figbird.resolve" in encoding.loader()
+    with pytest.raises(ValueError):
+        fig.to_json(deduplicate=True)
+
+
+def test_encode_deduplicate_shared_arrays():
+    x = np.arange("2000-01-01", "2000-01-04", dtype="datetime64[D]")
+    figure = {"data": [{"x": x, "y": np.arange(3.0)}, {"x": x, "y": np.ones(3)}]}
+    figure = encoding.encode(figure, deduplicate=True)
+    assert figure["data"][0]["x"] == figure["data"][1]["x"] == {"ref": 0}
+    assert figure["layout"]["xaxis"]["type"] == "date"
+    assert len(figure["arrays"]) == 1
+
+    result = encoding.decode(figure)
+    assert np.array_equal(result["data"][1]["x"], x)
+
+
+def test_encode_deduplicate_equal_copies():
+    x = np.arange(4.0)
+    figure = {"data": [{"x": x.copy(), "y": x + 1}, {"x": x.copy(), "y": x + 2}]}
+    figure = encoding.encode(figure, deduplicate=True)
+    assert figure["data"][0]["x"] == figure["data"][1]["x"] == {"ref": 0}
+    assert figure["data"][0]["y"] != figure["data"][1]["y"]
+    assert len(figure["arrays"]) == 1
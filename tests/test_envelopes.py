@@ -0,0 +1,98 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import numpy as np
+import pytest
+import xarray as xr
+
+import figbird
+from figbird import ensembles, envelopes
+
+
+def quantiles(n_quantiles=5, n_steps=10):
+    return xr.DataArray(
+        np.sort(np.random.default_rng(0).random((n_quantiles, n_steps)), axis=0),
+        dims=["quantile", "time"],
+        coords={"time": np.arange(n_steps)},
+        name="t2m",
+        attrs={"units": "K"},
+    )
+
+
+def test_polygons():
+    bounds = np.array([[0, 0, 0], [1, 1, 1], [2, 2, 2], [3, 4, 5]])
+    values, middle = envelopes.polygons(bounds)
+    assert middle is None
+    assert np.array_equal(values, [[0, 0, 0, 5, 4, 3], [1, 1, 1, 2, 2, 2]])
+
+
+def test_polygons_odd():
+    values, middle = envelopes.polygons(np.arange(3)[:, None] * np.ones((3, 2)))
+    assert values.shape == (1, 4)
+    assert np.array_equal(middle, [1, 1])
+
+
+def test_envelope_toself():
+    fig = figbird.envelope(quantiles(), fill="toself")
+    assert len(fig.data) == 3
+    assert [trace.fill for trace in fig.data] == ["toself", "toself", None]
+    assert [trace.showlegend for trace in fig.data] == [True, False, False]
+    assert len({trace.legendgroup for trace in fig.data}) == 1
+    assert np.array_equal(fig.data[0].x, list(range(10)) + list(range(9, -1, -1)))
+
+
+def test_envelope_toself_transformed_x():
+    bounds = [np.arange(12.0), np.arange(12.0) + 1]
+    fig = figbird.envelope(bounds, x="calendar.month", fill="toself")
+    assert len(fig.data[0].x) == 24
+    assert np.array_equal(fig.data[0].x[:12], fig.data[0].x[:11:-1])
+    assert str(fig.data[0].x[0]).startswith("0002-01")
+
+
+def test_envelope_toself_bounds_legend():
+    fig = figbird.envelope(quantiles(), fill="toself", showlegend="bounds")
+    assert all(trace.showlegend for trace in fig.data)
+    assert all(trace.legendgroup is not None for trace in fig.data)
+
+
+def test_envelope_invalid_fill():
+    with pytest.raises(ValueError):
+        figbird.envelope(quantiles(), fill="tozeroy")
+
+
+def members(n_members=11, n_steps=10):
+    return xr.DataArray(
+        np.random.default_rng(0).random((n_members, n_steps)),
+        dims=["member", "time"],
+        coords={"time": np.arange(n_steps)},
+        name="t2m",
+        attrs={"units": "K"},
+    )
+
+
+def test_envelope_quantiles():
+    data = members()
+    fig = figbird.envelope(data, quantiles=[0.9, 0.1, 0.5])
+    assert len(fig.data) == 3
+    assert np.allclose(fig.data[0].y, np.quantile(data.values, 0.1, axis=0))
+    assert np.allclose(fig.data[1].y, np.quantile(data.values, 0.9, axis=0))
+
+
+def test_envelope_quantiles_numpy():
+    data = members().values
+    fig = figbird.envelope(data, quantiles=[0.1, 0.9], fill="toself")
+    assert len(fig.data) == 1
+    assert np.allclose(fig.data[0].y[:10], np.quantile(data, 0.1, axis=0))
+
+
+def test_envelope_quantiles_dask():
+    pytest.importorskip("dask")
+    data = members()
+    bounds = ensembles.quantiles(data.chunk({"member": 2}), [0.25, 0.75])
+    assert bounds.chunks is None
+    assert np.allclose(bounds, data.quantile([0.25, 0.75], dim="member"))
@@ -0,0 +1,58 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import json
+
+import numpy as np
+import plotly.io as pio
+import pytest
+
+import figbird
+from figbird.export import ImagePool
+
+
+def figures(n):
+    for i in range(n):
+        yield figbird.line(np.arange(i + 2.0)), f"figure-{i}.json"
+
+
+def test_image_pool_map(tmp_path):
+    jobs = ((fig, tmp_path / path) for fig, path in figures(6))
+    with ImagePool(workers=2, max_pending=2, render=pio.write_json) as pool:
+        results = list(pool.map(jobs))
+
+    assert sorted(result.path for result in results) == sorted(
+        str(tmp_path / path) for _, path in figures(6)
+    )
+    assert all(result.latency >= result.render >= 0 for result in results)
+    figure = json.loads((tmp_path / "figure-3.json").read_text())
+    assert len(figure["data"][0]["y"]) == 5
+
+    summary = pool.summary()
+    assert summary["count"] == 6
+    assert summary["median"] <= summary["p95"] <= summary["max"]
+
+    with pytest.raises(RuntimeError):
+        pool.submit(figbird.line([1, 2]), tmp_path / "closed.json")
+
+
+def test_image_pool_errors(tmp_path):
+    with ImagePool(workers=1, render=pio.write_json) as pool:
+        future = pool.submit(figbird.line([1, 2]), tmp_path / "missing" / "a.json")
+        with pytest.raises(FileNotFoundError):
+            future.result()
+        assert pool.submit({"data": []}, tmp_path / "b.json").result().path
+    assert pool.summary()["count"] == 1
+
+
+def test_image_pool_kaleido(tmp_path):
+    pytest.importorskip("kaleido")
+    with ImagePool(workers=1, format="png") as pool:
+        result = pool.submit(figbird.line([1, 2]), tmp_path / "line.png").result()
+    assert (tmp_path / "line.png").read_bytes().startswith(b"\x89PNG")
+    assert result.latency > 0
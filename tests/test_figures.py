@@ -0,0 +1,201 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import json
+
+import numpy as np
+import pytest
+import xarray as xr
+
+import figbird
+from figbird.figures import Figure
+
+
+def ensemble(n_members=5, n_steps=20):
+    return xr.DataArray(
+        np.random.default_rng(0).random((n_members, n_steps)),
+        dims=["member", "time"],
+        coords={"time": np.arange(n_steps)},
+        name="t2m",
+        attrs={"units": "K", "long_name": "Temperature"},
+    )
+
+
+def test_add_lines_matches_add_line():
+    data = ensemble()
+    expected = Figure()
+    for member in range(len(data["member"])):
+        expected.add_line(data.isel(member=member))
+
+    result = figbird.lines(data, dim="member")
+
+    assert result.to_json() == expected.to_json()
+    assert result._trace_count == expected._trace_count
+
+
+def test_add_traces_from_sequence():
+    fig = Figure().add_traces_from([[1, 2, 3], [3, 2, 1]], trace_type="scatter")
+    assert len(fig.data) == 2
+    assert [trace.name for trace in fig.data] == ["trace 0", "trace 1"]
+
+
+def test_add_lines_variables():
+    dataset = xr.Dataset(
+        {
+            "t2m": ("time", np.arange(3.0), {"units": "K", "long_name": "Temperature"}),
+            "tp": ("time", np.ones(3), {"units": "m"}),
+        },
+        coords={"time": np.arange(3)},
+    )
+
+    fig = figbird.lines(dataset, variables="all")
+    assert [trace.name for trace in fig.data] == ["Temperature (K)", "tp (m)"]
+    assert [trace.hovertemplate for trace in fig.data] == ["%{y:.1f}K", "%{y:.1f}m"]
+    assert fig.data[1].y.tolist() == [1, 1, 1]
+    assert fig.layout.yaxis.title.text == ""
+
+    fig = figbird.lines(dataset, variables=["tp"])
+    assert len(fig.data) == 1
+    assert fig.layout.yaxis.title.text == "tp (m)"
+
+
+def test_batch_traces_next_color():
+    fig = Figure()
+    with fig.batch_traces():
+        fig.add_line([1, 2, 3])
+        assert len(fig.data) == 0
+        assert fig.next_color() == fig._schema.layout.colorway[1]
+    assert len(fig.data) == 1
+
+
+def test_add_ensemble_single_trace():
+    data = ensemble(n_members=3, n_steps=4)
+    fig = figbird.ensemble(data)
+
+    assert len(fig.data) == 1
+    trace = fig.data[0]
+    assert len(trace.y) == 3 * 5 - 1
+    assert np.isnan(trace.y[4]) and np.isnan(trace.y[9])
+    assert np.array_equal(trace.y[5:9], data.isel(member=1).values)
+    assert list(trace.customdata[:5]) == ["member=0"] * 5
+    assert "%{customdata}" in trace.hovertemplate
+
+
+def test_add_ensemble_numpy():
+    fig = figbird.ensemble(np.ones((2, 3)), dim=1)
+    assert len(fig.data[0].y) == 3 * 3 - 1
+    assert fig.data[0].hovertemplate == "%{y:.1f}<extra>%{customdata}</extra>"
+
+
+def test_line_marker_threshold():
+    assert figbird.line(np.arange(10)).data[0].mode == "lines"
+    with figbird.schema.settings.line.set(marker_threshold=60):
+        assert figbird.line(np.arange(10)).data[0].mode == "lines+markers"
+        assert figbird.line(np.arange(100)).data[0].mode == "lines"
+        assert figbird.line(np.arange(10), mode="lines").data[0].mode == "lines"
+
+
+def test_webgl_threshold():
+    fig = Figure()
+    with figbird.schema.settings.webgl.set(threshold=15):
+        fig.add_line(np.arange(10))
+        fig.add_bar(np.arange(3))
+        fig.add_line(np.arange(10))
+    assert [trace.type for trace in fig.data] == ["scattergl", "bar", "scattergl"]
+    assert list(fig.data[0].y) == list(range(10))
+
+
+def test_webgl_threshold_batch():
+    data = xr.DataArray(np.ones((30, 10)), dims=["number", "time"], name="t")
+    with figbird.schema.settings.webgl.set(threshold=250):
+        fig = figbird.lines(data, dim="number")
+    assert {trace.type for trace in fig.data} == {"scattergl"}
+    assert len(fig.data) == 30
+
+    with figbird.schema.settings.webgl.set(threshold=300):
+        fig = figbird.lines(data, dim="number")
+    assert {trace.type for trace in fig.data} == {"scatter"}
+
+
+def test_webgl_envelope():
+    bounds = [np.zeros(10), np.ones(10)]
+    with figbird.schema.settings.webgl.set(threshold=15):
+        fig = figbird.envelope(bounds)
+    assert [trace.type for trace in fig.data] == ["scattergl", "scattergl"]
+    assert fig.data[1].fill == "tonexty"
+
+    with figbird.schema.settings.webgl.set(threshold=25):
+        fig = figbird.envelope(bounds)
+    assert [trace.type for trace in fig.data] == ["scatter", "scatter"]
+
+
+def test_stripes_rows():
+    data = xr.DataArray(
+        np.array([[1.0, np.nan, 3.0], [-4.0, 0.0, 2.0]]),
+        dims=["region", "time"],
+        coords={"region": ["north", "south"], "time": [2000, 2001, 2002]},
+        name="anomaly",
+    )
+    fig = figbird.stripes(data, dim="region", divergence_point=1)
+
+    assert len(fig.data) == 1
+    trace = fig.data[0]
+    assert np.shape(trace.z) == (2, 3)
+    assert list(trace.y) == ["north", "south"]
+    assert list(trace.x) == [2000, 2001, 2002]
+    assert (trace.zmin, trace.zmax) == (-4, 6)
+    assert trace.hovertemplate.startswith("%{y}<br>")
+
+    transposed = figbird.stripes(data.values.T, dim=1).data[0]
+    assert np.array_equal(transposed.z, data.values, equal_nan=True)
+    assert list(transposed.y) == [0, 1]
+
+    with pytest.raises(ValueError):
+        figbird.stripes(data)
+
+
+def test_stripes_rows_squeeze():
+    data = xr.DataArray(
+        np.arange(30.0).reshape(1, 3, 10),
+        dims=["number", "region", "time"],
+        coords={"time": np.arange(10)},
+        name="t",
+    )
+    trace = figbird.stripes(data, dim="region").data[0]
+    assert np.array_equal(trace.z, data.values[0])
+    assert list(trace.y) == [0, 1, 2]
+
+    trace = figbird.stripes(data.values, dim=-2).data[0]
+    assert np.array_equal(trace.z, data.values[0])
+
+
+def test_stripes_single_row():
+    data = xr.DataArray([[1.0, np.nan, -2.0]], dims=["region", "time"], name="t")
+    fig = figbird.stripes(data)
+    trace = fig.data[0]
+    assert list(trace.y) == [1, 1, 1]
+    assert (trace.zmin, trace.zmax) == (-2, 2)
+
+
+def test_unvalidated_build_matches_validated():
+    data = ensemble()
+
+    def build(validate):
+        fig = Figure(validate=validate)
+        figbird.line(data[0], fig=fig, marker_size=4)
+        figbird.ensemble(data, fig=fig)
+        figbird.scatter(np.arange(5), fig=fig)
+        figbird.stripes(data[1], fig=fig)
+        return fig
+
+    validated, unvalidated = build(True), build(False)
+    assert json.loads(unvalidated.to_json()) == json.loads(validated.to_json())
+    assert unvalidated.data[0].marker.size == 4
+
+    with pytest.raises(ValueError):
+        figbird.line([1, 2, 3], fig=Figure(validate=False), mode="bogus")
@@ -0,0 +1,54 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import json
+import subprocess
+import sys
+
+import figbird
+
+HEAVY_MODULES = ["emohawk", "pandas", "plotly", "xarray"]
+
+IMPORT_TIME_BUDGET = 0.5  # seconds
+
+
+def run_isolated(code):
+    """Run `code` in a fresh interpreter and return the JSON it prints."""
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def test_import_is_lazy():
+    result = run_isolated(
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        "import figbird\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(json.dumps({'elapsed': elapsed, 'heavy': heavy}))\n"
+    )
+    assert result["heavy"] == []
+    assert result["elapsed"] < IMPORT_TIME_BUDGET
+
+
+def test_numpy_input_does_not_import_xarray():
+    result = run_isolated(
+        "import json, sys\n"
+        "import figbird\n"
+        "figbird.line([1, 2, 3])\n"
+        "figbird.envelope([[0, 1, 2], [1, 2, 3]])\n"
+        "print(json.dumps([m for m in ('emohawk', 'xarray') if m in sys.modules]))\n"
+    )
+    assert result == []
+
+
+def test_lazy_submodules():
+    assert figbird.figures.Figure.__name__ == "Figure"
+    assert figbird.line.__name__ == "line"
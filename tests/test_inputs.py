@@ -0,0 +1,137 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+import figbird
+from figbird import figures, inputs
+
+
+class Series:
+    def __init__(self, values):
+        self.values = values
+
+
+class SubArray(np.ndarray):
+    pass
+
+
+def test_get_sanitiser():
+    assert inputs.get_sanitiser(list) is inputs.numpy
+    assert inputs.get_sanitiser(np.ndarray) is inputs.numpy
+    assert inputs.get_sanitiser(SubArray) is inputs.numpy
+    assert inputs.get_sanitiser(xr.DataArray) is inputs.xarray
+    assert inputs.get_sanitiser(type(None)) is inputs.plotly
+    assert inputs.get_sanitiser(Series) is None
+
+
+def test_register_by_name():
+    @inputs.register(f"{__name__}.Series")
+    def series(self, data, args, kwargs):
+        return args, {**kwargs, "x": np.arange(len(data.values)), "y": data.values}
+
+    try:
+        assert inputs.get_sanitiser(Series) is series
+        fig = figbird.line(Series([3, 2, 1]), hovertemplate="%{y}")
+        assert np.array_equal(fig.data[0].y, [3, 2, 1])
+    finally:
+        inputs.unregister(f"{__name__}.Series")
+    assert inputs.get_sanitiser(Series) is None
+
+
+def test_registered_sanitiser_tried_once(monkeypatch):
+    calls = []
+
+    def declined(self, data, args, kwargs):
+        calls.append(data)
+
+    def series(self, data, args, kwargs):
+        return args, {**kwargs, "y": data.values}
+
+    monkeypatch.setattr(figures.Figure, "_SANITISERS", (declined, series))
+    inputs.register(f"{__name__}.Series")(declined)
+    try:
+        fig = figbird.line(Series([3, 2, 1]), hovertemplate="%{y}")
+    finally:
+        inputs.unregister(f"{__name__}.Series")
+    assert len(calls) == 1
+    assert np.array_equal(fig.data[0].y, [3, 2, 1])
+
+
+def global_field():
+    return xr.DataArray(
+        np.arange(4 * 3 * 2, dtype=float).reshape(4, 3, 2),
+        dims=["time", "latitude", "longitude"],
+        coords={
+            "time": np.arange(4),
+            "latitude": [50.0, 51.0, 52.0],
+            "longitude": [0.0, 1.0],
+        },
+        name="t2m",
+        attrs={"units": "K"},
+    )
+
+
+def test_select():
+    data = global_field()
+
+    point = inputs.select(data, sel={"latitude": 51.2, "longitude": 0.9}, nearest=True)
+    assert point.dims == ("time",)
+    assert np.array_equal(point.values, data.values[:, 1, 1])
+
+    with pytest.raises(KeyError):
+        inputs.select(data, sel={"latitude": 51.2})
+
+    subset = inputs.select(data, sel={"time": slice(1, 2)}, isel={"longitude": 0})
+    assert subset.dims == ("time", "latitude")
+    assert np.array_equal(subset.values, data.values[1:3, :, 0])
+
+    mean = inputs.select(data, mean_over=["latitude", "longitude"])
+    assert np.allclose(mean.values, data.values.mean(axis=(1, 2)))
+    assert mean.attrs == data.attrs
+
+
+def test_select_string_coordinate():
+    data = xr.DataArray(
+        np.arange(6.0).reshape(2, 3),
+        dims=["time", "station"],
+        coords={"time": np.arange(2), "station": ["A", "B", "C"]},
+        name="t",
+    )
+    fig = figbird.line(data, sel={"station": "B", "time": slice(0, 1)})
+    assert np.array_equal(fig.data[0].y, data.values[:, 1])
+
+    pair = inputs.select(data, sel={"station": ["C", "A"], "time": 0.8}, nearest=True)
+    assert np.array_equal(pair.values, data.values[1, [2, 0]])
+
+
+def test_select_partial_datetime():
+    data = xr.DataArray(
+        np.arange(4.0),
+        dims=["time"],
+        coords={
+            "time": pd.to_datetime(
+                ["2019-12-31", "2020-01-01", "2020-06-01", "2021-01-01"]
+            )
+        },
+        name="t",
+    )
+    assert np.array_equal(inputs.select(data, sel={"time": "2020"}).values, [1.0, 2.0])
+
+
+def test_line_with_selection():
+    data = global_field()
+    fig = figbird.line(data, sel={"latitude": 52}, isel={"longitude": -1})
+    assert np.array_equal(fig.data[0].y, data.values[:, 2, 1])
+    assert "sel" not in fig.data[0].to_plotly_json()
+
+    fig = figbird.ensemble(data, dim="latitude", sel={"longitude": 0})
+    assert np.array_equal(fig.data[0].y[:4], data.values[:, 0, 0])
@@ -0,0 +1,60 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import json
+
+import figbird
+from figbird import profiling
+
+
+def test_profile_records_stages_per_figure():
+    with figbird.profile() as profile:
+        first = figbird.line([1, 2, 3])
+        figbird.line([3, 2, 1], fig=first)
+        second = figbird.bar([1, 2, 3])
+        first.to_json()
+
+    result = profile.to_dict()
+    assert result["stages"]["sanitise"]["count"] == 3
+    assert result["stages"]["build_trace"]["count"] == 3
+    assert result["stages"]["serialise"]["count"] == 1
+    assert result["figures"]["figure 0"]["add_trace"]["count"] == 2
+    assert result["figures"]["figure 1"]["add_trace"]["count"] == 1
+    assert json.loads(profile.to_json()) == result
+    assert second is not first
+
+
+def test_profile_disabled_outside_context():
+    with figbird.profile() as profile:
+        pass
+    figbird.line([1, 2, 3])
+    assert profile.to_dict() == {"stages": {}, "figures": {}}
+
+
+def test_timed_records_exceptions():
+    @profiling.timed("failing")
+    def failing():
+        raise RuntimeError
+
+    with figbird.profile() as profile:
+        try:
+            failing()
+        except RuntimeError:
+            pass
+    assert profile.to_dict()["stages"]["failing"]["count"] == 1
+
+
+def test_profile_labels_are_not_reused():
+    class Figure:
+        pass
+
+    active = profiling.Profile()
+    for _ in range(3):
+        # Each figure is freed before the next, so ids are likely to be reused
+        active.record("build_trace", 0.1, Figure())
+    assert list(active.to_dict()["figures"]) == ["figure 0", "figure 1", "figure 2"]
@@ -0,0 +1,110 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import figbird
+from figbird.schema import Schema, schema
+
+
+def test_compile_resolves_format_strings():
+    compiled = schema.envelope.compile()
+    assert compiled["hovertemplate"] == schema.line.hovertemplate
+    assert compiled["line"]["shape"] == "linear"
+
+
+def test_compile_is_cached_and_read_only():
+    compiled = schema.line.compile()
+    assert schema.line.compile() is compiled
+    with pytest.raises(TypeError):
+        compiled["mode"] = "markers"
+
+
+def test_compile_invalidated_by_set():
+    before = schema.line.compile()["hovertemplate"]
+    with schema.settings.set(hoverprecision=".3f"):
+        assert ".3f" in schema.line.compile()["hovertemplate"]
+    assert schema.line.compile()["hovertemplate"] == before
+
+
+def test_compile_is_cached_per_scope():
+    default = schema.line.compile()
+    with schema.settings.set(hoverprecision=".3f"):
+        overridden = schema.line.compile()
+        assert schema.line.compile() is overridden
+        context = contextvars.copy_context()
+    assert schema.line.compile() is default
+    assert context.run(schema.line.compile) is overridden
+
+
+def test_compile_invalidated_by_setattr():
+    local = Schema(line={"width": 1})
+    assert local.compile()["line"]["width"] == 1
+    local.line_width = 3
+    assert local.compile()["line"]["width"] == 3
+
+
+def test_update_kwargs_does_not_modify_compiled():
+    kwargs = schema.line._update_kwargs({"line": {"width": 10}})
+    assert kwargs["line"]["width"] == 10
+    assert schema.line.compile()["line"]["width"] == schema.line.line_width
+
+
+def test_set_magic_keys_and_new_keys():
+    with schema.line.set(line_width=5, opacity=0.5):
+        assert schema.line.line_width == 5
+        assert schema.line.compile()["opacity"] == 0.5
+    assert schema.line.line_width == 2
+    assert "opacity" not in schema.line.compile()
+
+
+def test_set_applies_on_enter():
+    override = schema.line.set(line_width=5)
+    assert schema.line.line_width == 2
+    with override:
+        assert schema.line.line_width == 5
+    assert schema.line.line_width == 2
+
+
+def test_set_is_scoped_to_thread():
+    inside = threading.Barrier(2)
+    checked = threading.Event()
+
+    def override():
+        with schema.settings.set(hoverprecision=".3f"):
+            inside.wait()
+            checked.wait()
+            return schema.line.compile()["hovertemplate"]
+
+    def read():
+        inside.wait()
+        try:
+            return schema.line.compile()["hovertemplate"]
+        finally:
+            checked.set()
+
+    with ThreadPoolExecutor(2) as executor:
+        overridden = executor.submit(override)
+        default = executor.submit(read)
+        assert ".3f" in overridden.result()
+        assert ".3f" not in default.result()
+
+
+def test_parallel_stripes():
+    def stripes(diverging):
+        fig = figbird.stripes([1.0, -1.0, 2.0], diverging=diverging)
+        return fig.data[0].hovertemplate
+
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(stripes, [True, False] * 20))
+    assert set(results[::2]) == {"%{x}: %{z:+.1f}<extra></extra>"}
+    assert set(results[1::2]) == {"%{x}: %{z:.1f}<extra></extra>"}
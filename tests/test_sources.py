@@ -0,0 +1,119 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import os
+
+import numpy as np
+import xarray as xr
+
+import figbird
+from figbird import sources
+
+
+class Opener:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, data):
+        self.calls += 1
+        return object()
+
+
+def test_cache_paths(tmp_path):
+    path = tmp_path / "data.nc"
+    path.write_bytes(b"first")
+    cache = sources.SourceCache(maxsize=4)
+    opener = Opener()
+
+    first = cache.get(str(path), opener)
+    assert cache.get(path, opener) is first
+    assert opener.calls == 1
+
+    path.write_bytes(b"second version")
+    os.utime(path, ns=(0, 0))
+    assert cache.get(str(path), opener) is not first
+    assert opener.calls == 2
+
+    assert cache.get("not-a-file", opener) is not cache.get("not-a-file", opener)
+
+
+def test_cache_eviction(tmp_path):
+    cache = sources.SourceCache(maxsize=2)
+    opener = Opener()
+    paths = [tmp_path / f"{i}.nc" for i in range(3)]
+    for path in paths:
+        path.write_bytes(b"data")
+
+    for path in paths:
+        cache.get(path, opener)
+    assert len(cache) == 2
+
+    cache.get(paths[1], opener)
+    cache.get(paths[2], opener)
+    assert opener.calls == 3
+    cache.get(paths[0], opener)
+    assert opener.calls == 4
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.hits == cache.misses == 0
+
+    disabled = sources.SourceCache(maxsize=0)
+    disabled.get(paths[0], opener)
+    assert len(disabled) == 0
+
+
+def test_in_memory_inputs_are_not_cached():
+    cache = sources.SourceCache(maxsize=2)
+    opener = Opener()
+    data = xr.DataArray(np.arange(3.0), dims=["x"], name="y")
+    assert cache.get(data, opener) is not cache.get(data, opener)
+    assert len(cache) == 0
+
+    data.attrs["units"] = "K"
+    figbird.line(data)
+    data.attrs["units"] = "degC"
+    assert figbird.line(data).data[0].hovertemplate.endswith("degC")
+
+
+def test_figures_reuse_opened_sources(tmp_path, monkeypatch):
+    path = tmp_path / "data.nc"
+    path.write_bytes(b"data")
+    opener = Opener()
+    open_xarray = sources._open_dataset
+
+    def open_dataset(data):
+        if not isinstance(data, str):
+            return open_xarray(data)
+        opener(data)
+        return xr.Dataset({"y": ("x", np.arange(3.0)), "z": ("x", np.ones(3))})
+
+    monkeypatch.setattr(sources, "_open_dataset", open_dataset)
+    sources.clear()
+    try:
+        fig = figbird.line(str(path), y="z")
+        figbird.lines(str(path), variables="all", fig=fig)
+        assert opener.calls == 1
+        assert len(fig.data) == 3
+    finally:
+        sources.clear()
+
+
+def test_dataset_variables_are_not_reopened(monkeypatch):
+    opener = Opener()
+    open_xarray = sources._open_dataset
+
+    def open_dataset(data):
+        opener(data)
+        return open_xarray(data)
+
+    monkeypatch.setattr(sources, "_open_dataset", open_dataset)
+    dataset = xr.Dataset({"y": ("x", np.arange(3.0)), "z": ("x", np.ones(3))})
+    fig = figbird.lines(dataset, variables="all")
+    assert len(fig.data) == 2
+    assert opener.calls == 0
@@ -0,0 +1,79 @@
+# (C) Copyright 2022 ECMWF.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import numpy as np
+import pytest
+import xarray as xr
+from plotly.subplots import make_subplots
+
+import figbird
+from figbird import subplots
+
+
+def stations():
+    return xr.DataArray(
+        np.arange(2 * 3 * 4, dtype=float).reshape(4, 2, 3),
+        dims=["time", "level", "station"],
+        coords={
+            "time": np.arange(4),
+            "level": [1000, 500],
+            "station": ["a", "b", "c"],
+            "station_name": ("station", ["A", "B", "C"]),
+        },
+        name="t",
+        attrs={"units": "K", "long_name": "Temperature"},
+    )
+
+
+def test_grid_layout_matches_make_subplots():
+    expected = make_subplots(
+        rows=2,
+        cols=3,
+        shared_xaxes=True,
+        shared_yaxes=True,
+        subplot_titles=list("abcdef"),
+    )
+    result = subplots.grid_layout(2, 3, titles=list("abcdef"))
+
+    for key in ["xaxis", "xaxis2", "xaxis6", "yaxis", "yaxis4", "yaxis5"]:
+        for prop, value in expected.layout[key].to_plotly_json().items():
+            assert result[key][prop] == pytest.approx(value)
+    for expected_annotation, annotation in zip(
+        expected.layout.annotations, result["annotations"]
+    ):
+        assert annotation["x"] == pytest.approx(expected_annotation.x)
+        assert annotation["y"] == pytest.approx(expected_annotation.y)
+
+
+def test_facets():
+    data = stations()
+    fig = figbird.facets(data, row="level", col="station")
+
+    assert len(fig.data) == 6
+    trace = fig.data[4]
+    assert (trace.xaxis, trace.yaxis) == ("x5", "y5")
+    assert np.array_equal(trace.y, data.sel(level=500, station="b").values)
+    assert [t.showlegend for t in fig.data] == [True] + [False] * 5
+    assert len({t.line.color for t in fig.data}) == 1
+
+    assert fig.layout.annotations[4].text == "level=500, station=b"
+    assert fig.layout.xaxis4.title.text == "time"
+    assert fig.layout.xaxis.title.text == ""
+    assert fig.layout.yaxis.title.text == "Temperature (K)"
+    assert fig.layout.xaxis6.gridcolor == fig.layout.xaxis.gridcolor
+
+
+def test_facets_single_dim():
+    data = stations()
+    fig = figbird.facets(data, col="station", sel={"level": 1000})
+    assert len(fig.data) == 3
+    assert len(fig.layout.annotations) == 3
+    assert np.array_equal(fig.data[2].y, data.values[:, 0, 2])
+
+    with pytest.raises(ValueError):
+        figbird.facets(data, row="number")
@@ -10,7 +10,9 @@ from datetime import datetime
 
 import numpy as np
 import pytest
+import xarray as xr
 
+import figbird
 from figbird.transformers import calendar
 
 
@@ -103,3 +105,77 @@ def test_month_cyclic_missing_months():
                 datetime(year, 12, 16, 12),
             ],
         )
+
+
+def test_month_returns_datetime64():
+    result = calendar.month(np.arange(1, 13))
+    assert result.dtype == np.dtype("datetime64[ms]")
+    assert result[1] == np.datetime64("0002-02-14T00:00")
+
+
+def test_dayofyear_cyclic():
+    year = calendar.DUMMY_YEAR
+    result = calendar.dayofyear(np.arange(365), cyclic=True)
+    assert len(result) == 367
+    assert result[0] == np.datetime64(datetime(year - 1, 12, 31))
+    assert result[1] == np.datetime64(datetime(year, 1, 1))
+    assert result[-1] == np.datetime64(datetime(year + 1, 1, 1))
+
+
+def test_weekofyear():
+    year = calendar.DUMMY_YEAR
+    assert np.array_equal(
+        list(calendar.weekofyear([1, 2])),
+        [datetime(year, 1, 4, 12), datetime(year, 1, 11, 12)],
+    )
+
+
+def test_season_cyclic():
+    year = calendar.DUMMY_YEAR
+    assert np.array_equal(
+        list(calendar.season(np.array(["DJF", "MAM", "JJA", "SON"]), cyclic=True)),
+        [
+            datetime(year - 1, 10, 16, 12),
+            datetime(year, 1, 16, 12),
+            datetime(year, 4, 16, 0),
+            datetime(year, 7, 16, 0),
+            datetime(year, 10, 16, 12),
+            datetime(year + 1, 1, 16, 12),
+        ],
+    )
+
+
+def test_season_invalid():
+    with pytest.raises(ValueError):
+        calendar.season(["DJF", "XYZ"])
+
+
+def test_season_customdata():
+    customdata = calendar.HOVERTEMPLATES["season"]["customdata"]
+    dates = calendar.season(["DJF", "MAM", "JJA", "SON"])
+    assert customdata(dates) == [
+        "Winter (DJF)",
+        "Spring (MAM)",
+        "Summer (JJA)",
+        "Autumn (SON)",
+    ]
+
+
+def test_season_customdata_aligned_with_points():
+    data = xr.DataArray(
+        np.arange(4.0),
+        dims=["season"],
+        coords={"season": ["MAM", "JJA", "SON", "DJF"]},
+        name="t",
+    )
+    trace = figbird.line(data, x="calendar.season").data[0]
+    assert list(trace.customdata) == [
+        "Spring (MAM)",
+        "Summer (JJA)",
+        "Autumn (SON)",
+        "Winter (DJF)",
+    ]
+
+
+def test_numpy_hovertemplate_has_no_units_placeholder():
+    assert figbird.line(np.arange(3.0)).data[0].hovertemplate == "%{y:.1f}"